@@ -21,6 +21,7 @@ Usage:
 
 import argparse
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add src to path
@@ -61,9 +62,12 @@ def run_pipeline(
     ingestion = CrashDataIngestion(cache_dir="cache")
     crime_ingestion = CrimeDataIngestion(cache_dir="cache")
     grid_calc = GridRiskCalculator(resolution=h3_resolution)
-    crime_calc = CrimeRiskCalculator(resolution=h3_resolution)
+    crime_calc = CrimeRiskCalculator(
+        resolution=h3_resolution,
+        cache_dir="cache" if use_cache else None
+    )
     segment_mapper = SegmentRiskMapper()
-    time_analyzer = TimePatternAnalyzer()
+    time_analyzer = TimePatternAnalyzer(cache_dir="cache" if use_cache else None)
     exporter = RiskExporter(output_dir=output_dir, h3_resolution=h3_resolution)
     validator = ValidationStats()
 
@@ -73,11 +77,20 @@ def run_pipeline(
     print("\n[1/8] INGESTING CRASH DATA...")
     print("-" * 40)
 
-    ingestion.fetch_crashes(
-        limit=limit,
-        year_start=year_start,
-        use_cache=use_cache
-    )
+    # The crash and crime fetches are independent round-trips to the same
+    # Socrata host, so overlap them instead of paying for both serially
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        crash_future = pool.submit(
+            ingestion.fetch_crashes,
+            limit=limit, year_start=year_start, use_cache=use_cache
+        )
+        crime_future = pool.submit(
+            crime_ingestion.fetch_crimes,
+            limit=limit, year_start=year_start, use_cache=use_cache
+        )
+        crash_future.result()
+        crime_future.result()
+
     crash_gdf = ingestion.clean_and_geocode()
 
     print(f"Loaded {len(crash_gdf)} geocoded crashes")
@@ -91,11 +104,7 @@ def run_pipeline(
     print("\n[2/8] INGESTING CRIME DATA (NYPD Complaints)...")
     print("-" * 40)
 
-    crime_ingestion.fetch_crimes(
-        limit=limit,
-        year_start=year_start,
-        use_cache=use_cache
-    )
+    # Fetch already completed concurrently with the crash fetch above
     crime_gdf = crime_ingestion.clean_and_geocode()
 
     print(f"Loaded {len(crime_gdf)} geocoded street crimes")
@@ -212,12 +221,7 @@ def run_pipeline(
     print("\nGENERATING VALIDATION REPORT...")
     print("-" * 40)
 
-    validator.data_quality_check(crash_gdf)
-    validator.spatial_coverage_check(crash_gdf, grid_gdf)
-    validator.risk_distribution_analysis(grid_gdf)
-    validator.temporal_validation(hourly_df, period_df)
-    validator.hotspot_analysis(grid_gdf, segments_gdf)
-    validator.cross_validation_summary(crash_gdf)
+    validator.run_all(crash_gdf, grid_gdf, segments_gdf, hourly_df, period_df)
 
     report = validator.generate_full_report()
     validator.export_report(f"{output_dir}/validation_report.json")
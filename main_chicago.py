@@ -167,12 +167,7 @@ def run_pipeline(
     print("\nGENERATING VALIDATION REPORT...")
     print("-" * 40)
 
-    validator.data_quality_check(crash_gdf)
-    validator.spatial_coverage_check(crash_gdf, grid_gdf)
-    validator.risk_distribution_analysis(grid_gdf)
-    validator.temporal_validation(hourly_df, period_df)
-    validator.hotspot_analysis(grid_gdf, segments_gdf)
-    validator.cross_validation_summary(crash_gdf)
+    validator.run_all(crash_gdf, grid_gdf, segments_gdf, hourly_df, period_df)
 
     report = validator.generate_full_report()
     validator.export_report(f"{output_dir}/validation_report.json")
@@ -1,8 +1,66 @@
 import osmnx as ox
 import networkx as nx
 import json
+import numpy as np
 import os
 import h3
+from typing import NamedTuple
+
+# Shared fallback for cells without modifier dicts, so the per-cell
+# passes never allocate a fresh empty dict
+_EMPTY = {}
+
+# Fused multiply-add for the scalar blend on Python 3.13+, with a plain
+# expression on older runtimes
+try:
+    from math import fma as _fma
+except ImportError:
+    def _fma(x, y, z):
+        return x * y + z
+
+
+def _blend_scalar(crash_base, crash_mod, crime_base, crime_mod, wc, wr, has_crime,
+                  _fma=_fma):
+    """Float-only blend core for callers that pre-resolved the modifiers."""
+    # Unmapped cells dominate sparse grids; skip the weight math for them
+    if not crash_base and not crime_base:
+        return 0.0
+    crash_risk = crash_base * crash_mod
+    if crime_base == 0 and not has_crime:
+        return crash_risk
+    return _fma(wc, crash_risk, wr * (crime_base * crime_mod))
+
+
+# Default (crash_mod, crime_mod) pair for time keys absent from a cell
+_ONES = (1.0, 1.0)
+
+# Cells with identical modifier profiles share one table: distinct
+# profiles number in the dozens while cells number in the tens of
+# thousands, so interning shrinks the working set the traversal touches
+_MODIFIER_POOL = {}
+
+
+class CellInfo(NamedTuple):
+    """Per-cell risk record; attribute loads replace dict probes.
+
+    The crash and crime time modifiers are merged into one table keyed
+    by time_key, so a single probe yields both values.
+    """
+    base_risk: float = 0.0
+    crime_risk: float = 0.0
+    modifiers: dict = _EMPTY
+
+    @classmethod
+    def from_dict(cls, d):
+        tm = d.get("time_modifiers") or _EMPTY
+        ctm = d.get("crime_time_modifiers") or _EMPTY
+        merged = {
+            tk: (tm.get(tk, 1.0), ctm.get(tk, 1.0))
+            for tk in tm.keys() | ctm.keys()
+        } if (tm or ctm) else _EMPTY
+        if merged is not _EMPTY:
+            merged = _MODIFIER_POOL.setdefault(frozenset(merged.items()), merged)
+        return cls(d.get("base_risk", 0), d.get("crime_risk", 0), merged)
 
 class RoutingEngine:
     # Travel mode risk blending weights
@@ -13,6 +71,16 @@ class RoutingEngine:
         "driving":  {"crash": 0.9, "crime": 0.1},
         "cycling":  {"crash": 0.5, "crime": 0.5},
     }
+    # Mode names resolve to small integers once, and the (crash, crime)
+    # pairs live in a tuple indexed by that id — no string hashing on
+    # the blend path. Walking is id 0 and doubles as the unknown-mode
+    # fallback.
+    _MODE_IDS = {k: i for i, k in enumerate(MODE_WEIGHTS)}
+    _WEIGHTS_BY_ID = tuple((v["crash"], v["crime"]) for v in MODE_WEIGHTS.values())
+    # Each mode's weights must form a convex blend; verified once at
+    # import instead of per call or per test run
+    assert all(abs(wc + wr - 1.0) < 1e-9 for wc, wr in _WEIGHTS_BY_ID), \
+        "MODE_WEIGHTS must sum to 1.0 per mode"
 
     def __init__(self, place_name="Chicago, Illinois, USA", cache_path=None):
         if cache_path and os.path.exists(cache_path):
@@ -41,45 +109,124 @@ class RoutingEngine:
         print(f"Coverage: lng [{self.bounds['min_lng']:.4f}, {self.bounds['max_lng']:.4f}]")
         self.risk_data = {}
         self.has_crime_data = False
+        self._build_risk_soa()
 
     def load_risk_api(self, json_path):
         """Loads the provided routing_risk_api.json"""
         with open(json_path, 'r') as f:
             data = json.load(f)
-            self.risk_data = data.get("cells", {})
+            self.risk_data = {
+                cid: CellInfo.from_dict(c)
+                for cid, c in data.get("cells", {}).items()
+            }
             self.has_crime_data = data.get("metadata", {}).get("has_crime_data", False)
+        self._build_risk_soa()
         print(f"Loaded {len(self.risk_data)} risk-mapped hexagons.")
         if self.has_crime_data:
             print("Crime risk data detected - travel-mode-aware routing enabled.")
 
+    def _build_risk_soa(self):
+        """Parallel per-cell risk columns for whole-grid vector math."""
+        n = len(self.risk_data)
+        cells = self.risk_data.values()
+        self._cell_index = {cid: i for i, cid in enumerate(self.risk_data)}
+        self._base_risk = np.fromiter(
+            (c.base_risk for c in cells), dtype=np.float32, count=n
+        )
+        self._crime_risk = np.fromiter(
+            (c.crime_risk for c in cells), dtype=np.float32, count=n
+        )
+        # Materialized modifier columns per time_key; rebuilt data
+        # invalidates them wholesale
+        self._mod_cache = {}
+        # Fully blended per-cell arrays keyed by (time_key, travel_mode)
+        self._blend_cache = {}
+
+    def _modifier_arrays(self, time_key):
+        """Crash and crime time modifiers for one time_key, per cell.
+
+        A routing request holds one time_key across thousands of edge
+        evaluations, so the arrays are built once per key and reused;
+        there are only period x day_type keys, but cap the cache anyway.
+        """
+        cached = self._mod_cache.get(time_key)
+        if cached is not None:
+            return cached
+        n = len(self.risk_data)
+        cells = self.risk_data.values()
+        # One probe per cell yields both modifiers as a pair
+        pairs = np.fromiter(
+            (c.modifiers.get(time_key, _ONES) for c in cells),
+            dtype=np.dtype((np.float32, 2)), count=n
+        ).reshape(n, 2)
+        crash_mod = np.ascontiguousarray(pairs[:, 0])
+        crime_mod = np.ascontiguousarray(pairs[:, 1])
+        if len(self._mod_cache) >= 16:
+            self._mod_cache.pop(next(iter(self._mod_cache)))
+        self._mod_cache[time_key] = (crash_mod, crime_mod)
+        return crash_mod, crime_mod
+
+    def _get_blended_risk_batch(self, time_key, travel_mode="walking"):
+        """
+        Blended risk for every loaded cell as one float array, in
+        self._cell_index order. Same semantics as _get_blended_risk but
+        computed with four vector ops instead of a Python call per cell.
+        """
+        wc, wr = self._WEIGHTS_BY_ID[self._MODE_IDS.get(travel_mode, 0)]
+        crash_mod, crime_mod = self._modifier_arrays(time_key)
+        crash_risk = np.multiply(self._base_risk, crash_mod)
+        # Accumulate the blend in the two arrays this call owns instead
+        # of allocating a temporary per operator
+        blended = np.multiply(self._crime_risk, crime_mod)
+        blended *= wr
+        if self.has_crime_data:
+            np.multiply(crash_risk, wc, out=crash_risk)
+            blended += crash_risk
+        else:
+            blended += wc * crash_risk
+            # Crash-only fallback for cells with no crime signal
+            np.copyto(blended, crash_risk, where=self._crime_risk == 0)
+        return blended
+
+    def _blended_risk_for_cell(self, cell_id, time_key, travel_mode="walking"):
+        """
+        Memoized scalar blend: the first query for a (time_key, mode)
+        pair blends the whole grid once, and every later query — e.g.
+        repeated Dijkstra expansions over the same cells — is a dict
+        probe plus an array index.
+        """
+        key = (time_key, travel_mode)
+        arr = self._blend_cache.get(key)
+        if arr is None:
+            arr = self._get_blended_risk_batch(time_key, travel_mode)
+            if len(self._blend_cache) >= 64:
+                self._blend_cache.pop(next(iter(self._blend_cache)))
+            self._blend_cache[key] = arr
+        return float(arr[self._cell_index[cell_id]])
+
     def is_in_bounds(self, lat, lng):
         """Check if coordinates are within road network coverage"""
         return (self.bounds['min_lat'] <= lat <= self.bounds['max_lat'] and
                 self.bounds['min_lng'] <= lng <= self.bounds['max_lng'])
 
-    def _get_blended_risk(self, cell_info, time_key, travel_mode="walking"):
+    def _get_blended_risk(self, cell_info, time_key, travel_mode="walking",
+                          _weights=_WEIGHTS_BY_ID, _ids=_MODE_IDS):
         """
         Calculate blended risk based on travel mode.
         Walking: 70% crime + 30% crash
         Driving: 90% crash + 10% crime
         """
-        weights = self.MODE_WEIGHTS.get(travel_mode, self.MODE_WEIGHTS["walking"])
-
-        # Crash risk with time modifier
-        crash_base = cell_info.get("base_risk", 0)
-        crash_mod = cell_info.get("time_modifiers", {}).get(time_key, 1.0)
-        crash_risk = crash_base * crash_mod
-
-        # Crime risk with time modifier (falls back gracefully if no crime data)
-        crime_base = cell_info.get("crime_risk", 0)
-        crime_mod = cell_info.get("crime_time_modifiers", {}).get(time_key, 1.0)
-        crime_risk = crime_base * crime_mod
-
-        # If no crime data exists, fall back to crash-only
-        if crime_base == 0 and not self.has_crime_data:
-            return crash_risk
-
-        return (weights["crash"] * crash_risk) + (weights["crime"] * crime_risk)
+        # Defaults bind the id tables as fast locals; tuple indexing
+        # replaces the weights-dict probe
+        wc, wr = _weights[_ids.get(travel_mode, 0)]
+
+        # Unpack the cell once and hand plain floats to the blend core
+        crash_mod, crime_mod = cell_info.modifiers.get(time_key, _ONES)
+        return _blend_scalar(
+            cell_info.base_risk, crash_mod,
+            cell_info.crime_risk, crime_mod,
+            wc, wr, self.has_crime_data,
+        )
 
     def get_comparison(self, start_coords, end_coords, beta=5.0, hour=12, is_weekend=False, travel_mode="walking"):
         """
@@ -134,8 +281,8 @@ class RoutingEngine:
 
                 cell = h3.latlng_to_cell(coords[i][0], coords[i][1], 9)
                 if cell in self.risk_data:
-                    total_risk += self._get_blended_risk(
-                        self.risk_data[cell], time_key, travel_mode
+                    total_risk += self._blended_risk_for_cell(
+                        cell, time_key, travel_mode
                     )
 
         return {"total_time": total_time, "total_risk": total_risk}
@@ -173,8 +320,8 @@ class RoutingEngine:
             risk_val = 2.0  # Default unknown risk
 
             if cell in self.risk_data:
-                risk_val = self._get_blended_risk(
-                    self.risk_data[cell], time_key, travel_mode
+                risk_val = self._blended_risk_for_cell(
+                    cell, time_key, travel_mode
                 )
 
             return travel_time + (beta * risk_val)
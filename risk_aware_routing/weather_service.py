@@ -7,44 +7,56 @@ import requests
 import time
 
 
+# WMO weather codes → (description, category, risk_multiplier)
+_WEATHER_CODES = {
+    0:  ("Clear sky", "clear", 1.0),
+    1:  ("Mainly clear", "clear", 1.0),
+    2:  ("Partly cloudy", "cloudy", 1.0),
+    3:  ("Overcast", "cloudy", 1.0),
+    45: ("Fog", "fog", 1.15),
+    48: ("Freezing fog", "fog", 1.25),
+    51: ("Light drizzle", "drizzle", 1.1),
+    53: ("Moderate drizzle", "drizzle", 1.15),
+    55: ("Dense drizzle", "drizzle", 1.2),
+    56: ("Freezing drizzle", "freezing", 1.4),
+    57: ("Heavy freezing drizzle", "freezing", 1.5),
+    61: ("Light rain", "rain", 1.15),
+    63: ("Moderate rain", "rain", 1.25),
+    65: ("Heavy rain", "rain", 1.35),
+    66: ("Light freezing rain", "freezing", 1.5),
+    67: ("Heavy freezing rain", "freezing", 1.6),
+    71: ("Light snow", "snow", 1.25),
+    73: ("Moderate snow", "snow", 1.35),
+    75: ("Heavy snow", "snow", 1.5),
+    77: ("Snow grains", "snow", 1.25),
+    80: ("Light rain showers", "rain", 1.15),
+    81: ("Moderate rain showers", "rain", 1.25),
+    82: ("Heavy rain showers", "rain", 1.4),
+    85: ("Light snow showers", "snow", 1.25),
+    86: ("Heavy snow showers", "snow", 1.5),
+    95: ("Thunderstorm", "storm", 1.4),
+    96: ("Thunderstorm with hail", "storm", 1.6),
+    99: ("Thunderstorm with heavy hail", "storm", 1.7),
+}
+
+_CATEGORY_ICONS = {
+    "clear": "☀️", "cloudy": "☁️", "fog": "🌫️",
+    "drizzle": "🌦️", "rain": "🌧️", "snow": "🌨️",
+    "freezing": "🧊", "storm": "⛈️", "unknown": "🌡️",
+}
+
+_UNKNOWN_WEATHER = ("Unknown", "unknown", 1.0, _CATEGORY_ICONS["unknown"])
+
+
 class WeatherService:
-    # WMO weather codes → (description, category, risk_multiplier)
+    # WMO weather codes → (description, category, risk_multiplier, icon)
+    # Icon is baked in at import time so hot paths do one lookup per code.
     WEATHER_CODES = {
-        0:  ("Clear sky", "clear", 1.0),
-        1:  ("Mainly clear", "clear", 1.0),
-        2:  ("Partly cloudy", "cloudy", 1.0),
-        3:  ("Overcast", "cloudy", 1.0),
-        45: ("Fog", "fog", 1.15),
-        48: ("Freezing fog", "fog", 1.25),
-        51: ("Light drizzle", "drizzle", 1.1),
-        53: ("Moderate drizzle", "drizzle", 1.15),
-        55: ("Dense drizzle", "drizzle", 1.2),
-        56: ("Freezing drizzle", "freezing", 1.4),
-        57: ("Heavy freezing drizzle", "freezing", 1.5),
-        61: ("Light rain", "rain", 1.15),
-        63: ("Moderate rain", "rain", 1.25),
-        65: ("Heavy rain", "rain", 1.35),
-        66: ("Light freezing rain", "freezing", 1.5),
-        67: ("Heavy freezing rain", "freezing", 1.6),
-        71: ("Light snow", "snow", 1.25),
-        73: ("Moderate snow", "snow", 1.35),
-        75: ("Heavy snow", "snow", 1.5),
-        77: ("Snow grains", "snow", 1.25),
-        80: ("Light rain showers", "rain", 1.15),
-        81: ("Moderate rain showers", "rain", 1.25),
-        82: ("Heavy rain showers", "rain", 1.4),
-        85: ("Light snow showers", "snow", 1.25),
-        86: ("Heavy snow showers", "snow", 1.5),
-        95: ("Thunderstorm", "storm", 1.4),
-        96: ("Thunderstorm with hail", "storm", 1.6),
-        99: ("Thunderstorm with heavy hail", "storm", 1.7),
+        code: (desc, cat, mult, _CATEGORY_ICONS[cat])
+        for code, (desc, cat, mult) in _WEATHER_CODES.items()
     }
 
-    CATEGORY_ICONS = {
-        "clear": "☀️", "cloudy": "☁️", "fog": "🌫️",
-        "drizzle": "🌦️", "rain": "🌧️", "snow": "🌨️",
-        "freezing": "🧊", "storm": "⛈️", "unknown": "🌡️",
-    }
+    CATEGORY_ICONS = _CATEGORY_ICONS
 
     def __init__(self, lat=41.8781, lng=-87.6298):
         self.lat = lat
@@ -78,7 +90,7 @@ class WeatherService:
 
             current = data.get("current", {})
             code = current.get("weather_code", 0)
-            desc, category, risk_mult = self.WEATHER_CODES.get(code, ("Unknown", "unknown", 1.0))
+            desc, category, risk_mult, icon = self.WEATHER_CODES.get(code, _UNKNOWN_WEATHER)
 
             # Wind boost for high winds
             wind = current.get("wind_speed_10m", 0)
@@ -95,7 +107,7 @@ class WeatherService:
                     "weather_code": code,
                     "description": desc,
                     "category": category,
-                    "icon": self.CATEGORY_ICONS.get(category, "🌡️"),
+                    "icon": icon,
                     "risk_multiplier": round(risk_mult, 2),
                 },
                 "hourly": self._process_hourly(data.get("hourly", {})),
@@ -122,7 +134,7 @@ class WeatherService:
                 break
             hour = int(t.split("T")[1].split(":")[0])
             code = codes[i] if i < len(codes) else 0
-            desc, cat, mult = self.WEATHER_CODES.get(code, ("Unknown", "unknown", 1.0))
+            desc, cat, mult, icon = self.WEATHER_CODES.get(code, _UNKNOWN_WEATHER)
             w = winds[i] if i < len(winds) else 0
             if w > 25:
                 mult += 0.1
@@ -133,7 +145,7 @@ class WeatherService:
                 "wind": round(w, 1) if i < len(winds) else 0,
                 "description": desc,
                 "category": cat,
-                "icon": self.CATEGORY_ICONS.get(cat, "🌡️"),
+                "icon": icon,
                 "risk_multiplier": round(mult, 2),
             })
         return result
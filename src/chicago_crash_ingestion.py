@@ -2,13 +2,17 @@
 Chicago Crash Data Ingestion Module
 Fetches Traffic Crashes data from Chicago Data Portal (Socrata API)
 """
+import orjson
 import requests
 import pandas as pd
 import geopandas as gpd
-from shapely.geometry import Point
+import shapely
+from geopandas.array import from_shapely
 from pathlib import Path
 from typing import Optional
 
+from .parquet_cache import read_cached_parquet
+
 
 class ChicagoCrashIngestion:
     """Fetches and processes Chicago Traffic Crash data"""
@@ -16,6 +20,27 @@ class ChicagoCrashIngestion:
     # Chicago Data Portal - Traffic Crashes
     BASE_URL = "https://data.cityofchicago.org/resource/85ca-t3if.json"
 
+    # Columns requested from the API; reused for parquet column pushdown
+    SELECT_COLS = [
+        "crash_date",
+        "crash_hour",
+        "crash_day_of_week",
+        "crash_month",
+        "latitude",
+        "longitude",
+        "street_no",
+        "street_direction",
+        "street_name",
+        "injuries_total",
+        "injuries_fatal",
+        "injuries_incapacitating",
+        "injuries_non_incapacitating",
+        "most_severe_injury",
+        "prim_contributory_cause",
+        "crash_type",
+        "first_crash_type"
+    ]
+
     def __init__(self, cache_dir: str = "cache"):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
@@ -32,20 +57,12 @@ class ChicagoCrashIngestion:
 
         if use_cache and cache_file.exists():
             print(f"Loading cached Chicago crash data from {cache_file}")
-            self.raw_data = pd.read_parquet(cache_file)
+            self.raw_data = read_cached_parquet(cache_file, self.SELECT_COLS)
             return self.raw_data
 
         print(f"Fetching up to {limit} Chicago crash records...")
 
-        select_cols = ",".join([
-            "crash_date", "crash_hour", "crash_day_of_week", "crash_month",
-            "latitude", "longitude",
-            "street_no", "street_direction", "street_name",
-            "injuries_total", "injuries_fatal",
-            "injuries_incapacitating", "injuries_non_incapacitating",
-            "most_severe_injury", "prim_contributory_cause",
-            "crash_type", "first_crash_type"
-        ])
+        select_cols = ",".join(self.SELECT_COLS)
 
         PAGE_SIZE = 50000
         all_records = []
@@ -64,7 +81,7 @@ class ChicagoCrashIngestion:
                 }
                 response = requests.get(self.BASE_URL, params=params, timeout=60)
                 response.raise_for_status()
-                page = response.json()
+                page = orjson.loads(response.content)
                 if not page:
                     break
                 all_records.extend(page)
@@ -79,7 +96,7 @@ class ChicagoCrashIngestion:
             if fallback is not None:
                 print(f"WARNING: API request failed ({e.__class__.__name__}). "
                       f"Using fallback cache: {fallback}")
-                self.raw_data = pd.read_parquet(fallback)
+                self.raw_data = read_cached_parquet(fallback, self.SELECT_COLS)
                 return self.raw_data
             raise ConnectionError(
                 f"Cannot fetch Chicago crash data and no cached files found.\n"
@@ -87,7 +104,9 @@ class ChicagoCrashIngestion:
             ) from e
 
         self.raw_data = pd.DataFrame(all_records)
-        self.raw_data.to_parquet(cache_file)
+        self.raw_data.to_parquet(
+            cache_file, engine="pyarrow", compression="zstd", compression_level=3
+        )
         print(f"Cached {len(self.raw_data)} records to {cache_file}")
 
         return self.raw_data
@@ -104,7 +123,17 @@ class ChicagoCrashIngestion:
         if self.raw_data is None:
             raise ValueError("No data loaded. Call fetch_crashes() first.")
 
-        df = self.raw_data.copy()
+        # Select only the columns used downstream instead of deep-copying
+        # the full raw frame (20+ columns for 50k rows)
+        needed_cols = [
+            "crash_date", "crash_hour", "crash_day_of_week", "crash_month",
+            "latitude", "longitude", "street_name",
+            "injuries_total", "injuries_fatal",
+            "injuries_incapacitating", "injuries_non_incapacitating"
+        ]
+        df = self.raw_data[
+            [c for c in needed_cols if c in self.raw_data.columns]
+        ].copy()
 
         # Convert coordinates
         df["latitude"] = pd.to_numeric(df["latitude"], errors="coerce")
@@ -164,8 +193,16 @@ class ChicagoCrashIngestion:
         df["cross_street_name"] = None
 
         # Create geometry
-        geometry = [Point(xy) for xy in zip(df["longitude"], df["latitude"])]
-        self.geo_data = gpd.GeoDataFrame(df, geometry=geometry, crs="EPSG:4326")
+        # Build the GeometryArray in one vectorized pass instead of
+        # per-row Point objects plus a list-to-array conversion
+        geometry = from_shapely(
+            shapely.points(
+                df["longitude"].to_numpy(dtype=float),
+                df["latitude"].to_numpy(dtype=float)
+            ),
+            crs="EPSG:4326"
+        )
+        self.geo_data = gpd.GeoDataFrame(df, geometry=geometry)
 
         return self.geo_data
 
@@ -3,13 +3,17 @@ Chicago Crime Data Ingestion Module
 Fetches crime data from Chicago Data Portal (Socrata API)
 for pedestrian safety risk scoring
 """
+import orjson
 import requests
 import pandas as pd
 import geopandas as gpd
-from shapely.geometry import Point
+import shapely
+from geopandas.array import from_shapely
 from pathlib import Path
 from typing import Optional
 
+from .parquet_cache import read_cached_parquet
+
 
 class ChicagoCrimeIngestion:
     """Fetches and processes Chicago crime data"""
@@ -17,6 +21,19 @@ class ChicagoCrimeIngestion:
     # Chicago Data Portal - Crimes (2001 to Present)
     BASE_URL = "https://data.cityofchicago.org/resource/ijzp-q8t2.json"
 
+    # Columns requested from the API; reused for parquet column pushdown
+    SELECT_COLS = [
+        "id",
+        "date",
+        "primary_type",
+        "description",
+        "location_description",
+        "arrest",
+        "domestic",
+        "latitude",
+        "longitude"
+    ]
+
     # Chicago crime types with severity weights (pedestrian safety focus)
     CRIME_WEIGHTS = {
         "HOMICIDE": 10,
@@ -60,7 +77,7 @@ class ChicagoCrimeIngestion:
 
         if use_cache and cache_file.exists():
             print(f"Loading cached Chicago crime data from {cache_file}")
-            self.raw_data = pd.read_parquet(cache_file)
+            self.raw_data = read_cached_parquet(cache_file, self.SELECT_COLS)
             return self.raw_data
 
         print(f"Fetching up to {limit} Chicago crime records...")
@@ -71,11 +88,7 @@ class ChicagoCrimeIngestion:
             f"AND latitude IS NOT NULL "
             f"AND primary_type IN('{crime_types}')"
         )
-        select_cols = ",".join([
-            "id", "date", "primary_type", "description",
-            "location_description", "arrest", "domestic",
-            "latitude", "longitude"
-        ])
+        select_cols = ",".join(self.SELECT_COLS)
 
         PAGE_SIZE = 50000
         all_records = []
@@ -94,7 +107,7 @@ class ChicagoCrimeIngestion:
                 }
                 response = requests.get(self.BASE_URL, params=params, timeout=120)
                 response.raise_for_status()
-                page = response.json()
+                page = orjson.loads(response.content)
                 if not page:
                     break
                 all_records.extend(page)
@@ -109,7 +122,7 @@ class ChicagoCrimeIngestion:
             if fallback is not None:
                 print(f"WARNING: API request failed ({e.__class__.__name__}). "
                       f"Using fallback cache: {fallback}")
-                self.raw_data = pd.read_parquet(fallback)
+                self.raw_data = read_cached_parquet(fallback, self.SELECT_COLS)
                 return self.raw_data
             raise ConnectionError(
                 f"Cannot fetch Chicago crime data and no cached files found.\n"
@@ -117,7 +130,9 @@ class ChicagoCrimeIngestion:
             ) from e
 
         self.raw_data = pd.DataFrame(all_records)
-        self.raw_data.to_parquet(cache_file)
+        self.raw_data.to_parquet(
+            cache_file, engine="pyarrow", compression="zstd", compression_level=3
+        )
         print(f"Cached {len(self.raw_data)} crime records to {cache_file}")
 
         return self.raw_data
@@ -134,7 +149,15 @@ class ChicagoCrimeIngestion:
         if self.raw_data is None:
             raise ValueError("No data loaded. Call fetch_crimes() first.")
 
-        df = self.raw_data.copy()
+        # Select only the columns used downstream instead of deep-copying
+        # the full raw frame
+        needed_cols = [
+            "date", "primary_type", "location_description", "arrest",
+            "latitude", "longitude"
+        ]
+        df = self.raw_data[
+            [c for c in needed_cols if c in self.raw_data.columns]
+        ].copy()
 
         df["latitude"] = pd.to_numeric(df["latitude"], errors="coerce")
         df["longitude"] = pd.to_numeric(df["longitude"], errors="coerce")
@@ -181,8 +204,16 @@ class ChicagoCrimeIngestion:
 
         print(f"Valid geocoded crime records: {len(df)}")
 
-        geometry = [Point(xy) for xy in zip(df["longitude"], df["latitude"])]
-        self.geo_data = gpd.GeoDataFrame(df, geometry=geometry, crs="EPSG:4326")
+        # Build the GeometryArray in one vectorized pass instead of
+        # per-row Point objects plus a list-to-array conversion
+        geometry = from_shapely(
+            shapely.points(
+                df["longitude"].to_numpy(dtype=float),
+                df["latitude"].to_numpy(dtype=float)
+            ),
+            crs="EPSG:4326"
+        )
+        self.geo_data = gpd.GeoDataFrame(df, geometry=geometry)
 
         return self.geo_data
 
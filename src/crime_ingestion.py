@@ -3,13 +3,28 @@ NYC Crime Data Ingestion Module
 Fetches NYPD Complaint Data from NYC Open Data (Socrata API)
 for pedestrian safety risk scoring
 """
+import orjson
 import requests
+import numpy as np
 import pandas as pd
 import geopandas as gpd
-from shapely.geometry import Point
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter, Retry
 from pathlib import Path
 from typing import Optional
 
+from .parquet_cache import read_cached_parquet
+
+
+# Pooled session shared across paged Socrata requests: reuses TCP/TLS
+# connections and retries transient failures with backoff
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=8,
+    max_retries=Retry(total=3, backoff_factor=0.5)
+))
+
 
 class CrimeDataIngestion:
     """Fetches and processes NYPD Complaint (crime) data"""
@@ -17,6 +32,20 @@ class CrimeDataIngestion:
     # NYC Open Data - NYPD Complaint Data Historic
     BASE_URL = "https://data.cityofnewyork.us/resource/qgea-i56i.json"
 
+    # Columns requested from the API; reused for parquet column pushdown
+    SELECT_COLS = [
+        "cmplnt_num",
+        "cmplnt_fr_dt",
+        "cmplnt_fr_tm",
+        "ofns_desc",
+        "law_cat_cd",
+        "boro_nm",
+        "prem_typ_desc",
+        "loc_of_occur_desc",
+        "latitude",
+        "longitude"
+    ]
+
     # Crime types relevant to pedestrian safety, with severity weights
     CRIME_WEIGHTS = {
         "MURDER & NON-NEGL. MANSLAUGHTER": 10,
@@ -59,65 +88,58 @@ class CrimeDataIngestion:
 
         if use_cache and cache_file.exists():
             print(f"Loading cached crime data from {cache_file}")
-            self.raw_data = pd.read_parquet(cache_file)
+            self.raw_data = read_cached_parquet(cache_file, self.SELECT_COLS)
             return self.raw_data
 
         print(f"Fetching up to {limit} crime records from NYC Open Data...")
 
-        # Filter to relevant crime types
+        # Filter to relevant crime types and outdoor premises server-side:
+        # without the premise pushdown the API returns ~5x the rows that
+        # survive the client-side outdoor filter
         crime_types = "','".join(self.CRIME_WEIGHTS.keys())
+        premises = "','".join(self.OUTDOOR_PREMISES)
         where_clause = (
             f"cmplnt_fr_dt >= '{year_start}-01-01T00:00:00' "
             f"AND latitude IS NOT NULL "
-            f"AND ofns_desc IN('{crime_types}')"
+            f"AND ofns_desc IN('{crime_types}') "
+            f"AND prem_typ_desc IN('{premises}')"
         )
-        select_cols = ",".join([
-            "cmplnt_num",
-            "cmplnt_fr_dt",
-            "cmplnt_fr_tm",
-            "ofns_desc",
-            "law_cat_cd",
-            "boro_nm",
-            "prem_typ_desc",
-            "loc_of_occur_desc",
-            "latitude",
-            "longitude",
-        ])
-
-        # Paginate: Socrata caps at 50k per request
-        PAGE_SIZE = 50000
-        all_records = []
-        offset = 0
-        remaining = limit
+        select_cols = ",".join(self.SELECT_COLS)
+
+        # Paginate: smaller pages fetched concurrently over the pooled
+        # session so wall time tracks the slowest page, not the serial sum
+        PAGE_SIZE = 5000
+
+        def fetch_page(offset: int) -> list:
+            params = {
+                "$limit": min(PAGE_SIZE, limit - offset),
+                "$offset": offset,
+                "$where": where_clause,
+                # Most recent first, with the unique complaint id breaking
+                # date ties: the total ordering keeps concurrent offset
+                # pages disjoint (date-only ordering has ties, so rows
+                # could repeat or vanish across page seams) while still
+                # sampling the newest rows when the dataset exceeds limit
+                "$order": "cmplnt_fr_dt DESC, cmplnt_num",
+                "$select": select_cols
+            }
+            response = _session.get(self.BASE_URL, params=params, timeout=120)
+            response.raise_for_status()
+            # orjson parses the multi-MB payload several times faster than
+            # the stdlib json used by response.json()
+            return orjson.loads(response.content)
 
         try:
-            while remaining > 0:
-                page_limit = min(PAGE_SIZE, remaining)
-                params = {
-                    "$limit": page_limit,
-                    "$offset": offset,
-                    "$where": where_clause,
-                    "$order": "cmplnt_fr_dt DESC",
-                    "$select": select_cols
-                }
-                response = requests.get(self.BASE_URL, params=params, timeout=120)
-                response.raise_for_status()
-                page = response.json()
-                if not page:
-                    break
-                all_records.extend(page)
-                offset += len(page)
-                remaining -= len(page)
-                if len(page) < page_limit:
-                    break
-                if offset > page_limit:
-                    print(f"  Fetched {offset} crime records so far...")
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                pages = list(pool.map(fetch_page, range(0, limit, PAGE_SIZE)))
+            all_records = [record for page in pages for record in page]
+            print(f"  Fetched {len(all_records)} crime records")
         except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
             fallback = self._find_fallback_cache("crimes_*.parquet")
             if fallback is not None:
                 print(f"WARNING: API request failed ({e.__class__.__name__}). "
                       f"Using fallback cache: {fallback}")
-                self.raw_data = pd.read_parquet(fallback)
+                self.raw_data = read_cached_parquet(fallback, self.SELECT_COLS)
                 return self.raw_data
             raise ConnectionError(
                 f"Cannot fetch crime data and no cached files found in {self.cache_dir}/.\n"
@@ -128,7 +150,9 @@ class CrimeDataIngestion:
         self.raw_data = pd.DataFrame(all_records)
 
         # Cache for faster subsequent runs
-        self.raw_data.to_parquet(cache_file)
+        self.raw_data.to_parquet(
+            cache_file, engine="pyarrow", compression="zstd", compression_level=3
+        )
         print(f"Cached {len(self.raw_data)} crime records to {cache_file}")
 
         return self.raw_data
@@ -150,28 +174,35 @@ class CrimeDataIngestion:
         if self.raw_data is None:
             raise ValueError("No data loaded. Call fetch_crimes() first.")
 
-        df = self.raw_data.copy()
-
-        # Convert coordinates to numeric
-        df["latitude"] = pd.to_numeric(df["latitude"], errors="coerce")
-        df["longitude"] = pd.to_numeric(df["longitude"], errors="coerce")
+        # Build the validity and outdoor masks on scratch Series, then
+        # materialize the filtered frame once instead of three full copies
+        raw = self.raw_data
+        lat = pd.to_numeric(raw["latitude"], errors="coerce")
+        lng = pd.to_numeric(raw["longitude"], errors="coerce")
 
         # Filter valid coordinates (NYC bounding box)
         valid_mask = (
-            df["latitude"].notna() &
-            df["longitude"].notna() &
-            (df["latitude"] > 40.4) &
-            (df["latitude"] < 41.0) &
-            (df["longitude"] > -74.3) &
-            (df["longitude"] < -73.6)
+            lat.notna() & lng.notna() &
+            (lat > 40.4) & (lat < 41.0) &
+            (lng > -74.3) & (lng < -73.6)
         )
-        df = df[valid_mask].copy()
 
-        # Filter to outdoor/street crimes (most relevant for pedestrians)
-        if "prem_typ_desc" in df.columns:
-            outdoor_mask = df["prem_typ_desc"].isin(self.OUTDOOR_PREMISES)
-            df = df[outdoor_mask].copy()
-            print(f"Filtered to {len(df)} outdoor/street crimes")
+        # Filter to outdoor/street crimes (most relevant for pedestrians).
+        # The SoQL query already pushes this down, but older caches may
+        # still contain indoor rows.
+        if "prem_typ_desc" in raw.columns:
+            valid_mask &= raw["prem_typ_desc"].isin(self.OUTDOOR_PREMISES)
+
+        df = raw.loc[valid_mask].reset_index(drop=True)
+        df["latitude"] = lat[valid_mask].to_numpy()
+        df["longitude"] = lng[valid_mask].to_numpy()
+        print(f"Filtered to {len(df)} valid outdoor/street crimes")
+
+        # Categorical codes turn the isin/map/groupby work below into
+        # integer-code lookups instead of per-row string hashing
+        for col in ["ofns_desc", "law_cat_cd", "boro_nm", "prem_typ_desc"]:
+            if col in df.columns:
+                df[col] = df[col].astype("category")
 
         # Parse datetime
         if "cmplnt_fr_dt" in df.columns and "cmplnt_fr_tm" in df.columns:
@@ -185,17 +216,32 @@ class CrimeDataIngestion:
         df["hour"] = df["crime_datetime"].dt.hour
         df["day_of_week"] = df["crime_datetime"].dt.dayofweek
 
-        # Assign severity based on crime type
-        df["severity"] = df["ofns_desc"].map(self.CRIME_WEIGHTS).fillna(1).astype(float)
-
-        # Felonies get a boost
-        df.loc[df["law_cat_cd"] == "FELONY", "severity"] *= 1.5
+        # Assign severity based on crime type, with a 1.5x felony boost,
+        # as one fused multiply-add. The weights resolve through a small
+        # per-category table indexed by the categorical codes, so each
+        # crime-type string is hashed once per category rather than
+        # passing through map/fillna Series machinery
+        weight_table = np.array(
+            [self.CRIME_WEIGHTS.get(c, 1) for c in df["ofns_desc"].cat.categories],
+            dtype=np.float32
+        )
+        codes = df["ofns_desc"].cat.codes.to_numpy()
+        base = np.where(
+            codes >= 0, weight_table[np.maximum(codes, 0)], np.float32(1.0)
+        )
+        felony = df["law_cat_cd"].to_numpy() == "FELONY"
+        df["severity"] = base * (1.0 + 0.5 * felony)
 
         print(f"Valid geocoded crime records: {len(df)}")
 
         # Create geometry
-        geometry = [Point(xy) for xy in zip(df["longitude"], df["latitude"])]
-        self.geo_data = gpd.GeoDataFrame(df, geometry=geometry, crs="EPSG:4326")
+        # Vectorized batch constructor instead of one GEOS Point per row
+        geometry = gpd.points_from_xy(
+            df["longitude"].to_numpy(),
+            df["latitude"].to_numpy(),
+            crs="EPSG:4326"
+        )
+        self.geo_data = gpd.GeoDataFrame(df, geometry=geometry)
 
         return self.geo_data
 
@@ -3,29 +3,85 @@ Crime Risk Calculation Module
 Calculates crime-based risk scores on H3 hexagonal grid,
 then blends with crash risk for travel-mode-aware combined scores.
 """
+import hashlib
 import h3
+import h3.api.numpy_int as h3int
 import pandas as pd
 import numpy as np
+from pathlib import Path
 from typing import Optional
 
 
 class CrimeRiskCalculator:
     """Calculate crime risk scores on H3 hexagonal grid"""
 
-    def __init__(self, resolution: int = 9):
+    # Bump whenever the risk math changes, so stale computed-result
+    # caches are invalidated
+    CACHE_VERSION = 1
+
+    def __init__(self, resolution: int = 9, cache_dir: Optional[str] = None):
         self.resolution = resolution
         self.grid_data: Optional[pd.DataFrame] = None
+        # Optional second-tier cache for computed cell stats (the raw API
+        # cache lives in the ingestion classes); None disables it
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(exist_ok=True)
+        # cell -> tuple of ring-1 neighbors; each h3.grid_ring call crosses
+        # the FFI boundary, so look each cell up at most once
+        self._neighbor_cache: dict = {}
+
+    def _result_cache_path(self, kind: str, gdf, *extra) -> Optional[Path]:
+        """
+        Cache file for a computed result, keyed by a cheap fingerprint of
+        the input data plus the parameters that affect the output.
+        """
+        if self.cache_dir is None:
+            return None
+        fingerprint = "|".join(str(part) for part in (
+            kind, self.CACHE_VERSION, self.resolution, len(gdf),
+            float(gdf["severity"].sum()) if "severity" in gdf.columns else 0,
+            gdf["crime_datetime"].min() if "crime_datetime" in gdf.columns else "",
+            gdf["crime_datetime"].max() if "crime_datetime" in gdf.columns else "",
+            *extra
+        ))
+        key = hashlib.blake2b(fingerprint.encode()).hexdigest()[:16]
+        return self.cache_dir / f"{kind}_{key}.parquet"
+
+    def _neighbor_ring(self, cell):
+        """Ring-1 neighbors of a cell (uint64), memoized across calls."""
+        ring = self._neighbor_cache.get(cell)
+        if ring is None:
+            ring = self._neighbor_cache[cell] = tuple(h3int.grid_ring(cell, 1))
+        return ring
+
+    @staticmethod
+    def _cells_to_int(values) -> np.ndarray:
+        """Normalize an h3_cell column to H3's native uint64 form."""
+        if values.dtype == np.uint64:
+            return values
+        return np.fromiter(
+            (h3.str_to_int(c) for c in values),
+            dtype=np.uint64, count=len(values)
+        )
 
     def assign_h3_cells(self, gdf):
-        """Assign H3 cell ID to each crime point"""
-        gdf = gdf.copy()
-        gdf["h3_cell"] = gdf.apply(
-            lambda row: h3.latlng_to_cell(
-                row.geometry.y, row.geometry.x, self.resolution
-            ),
-            axis=1
+        """Assign H3 cell ID (native uint64) to each crime point"""
+        # Iterate raw coordinate arrays instead of DataFrame.apply, which
+        # boxes every row into a Series (h3-py has no array API yet).
+        # The numpy_int API emits uint64 cells, which hash and group much
+        # faster than 15-char hex strings; hex is restored at export time.
+        lats = gdf.geometry.y.to_numpy()
+        lngs = gdf.geometry.x.to_numpy()
+        resolution = self.resolution
+        cells = np.fromiter(
+            (h3int.latlng_to_cell(lat, lng, resolution)
+             for lat, lng in zip(lats, lngs)),
+            dtype=np.uint64, count=len(lats)
         )
-        return gdf
+        # assign() shallow-copies the frame (new column only) rather than
+        # deep-copying every existing block like .copy() did
+        return gdf.assign(h3_cell=cells)
 
     def calculate_cell_crime_risk(self, gdf, time_weighted=True):
         """
@@ -33,26 +89,45 @@ class CrimeRiskCalculator:
 
         Returns DataFrame with crime_risk per cell (0-100 scale).
         """
+        # Warm-start from the computed-result cache; the time weights
+        # depend on today's date, so the key is date-scoped when weighted
+        cache_path = self._result_cache_path(
+            "crime_grid", gdf, time_weighted,
+            pd.Timestamp.now().date() if time_weighted else ""
+        )
+        if cache_path is not None and cache_path.exists():
+            print(f"Loading computed crime grid from {cache_path}")
+            self.grid_data = pd.read_parquet(cache_path, engine="pyarrow")
+            return self.grid_data
+
         if "h3_cell" not in gdf.columns:
             gdf = self.assign_h3_cells(gdf)
 
-        df = gdf.copy()
+        severity = gdf["severity"].to_numpy(dtype=float)
 
         # Time decay: recent crimes weighted more
-        if time_weighted and "crime_datetime" in df.columns:
+        if time_weighted and "crime_datetime" in gdf.columns:
             now = pd.Timestamp.now()
-            days_ago = (now - df["crime_datetime"]).dt.days
-            df["time_weight"] = np.where(
-                days_ago < 180, 2.0,
-                np.where(days_ago < 365, 1.5, 1.0)
-            )
+            days_ago = (now - gdf["crime_datetime"]).dt.days.to_numpy()
+            # Fill one buffer with masked writes instead of allocating two
+            # full-length np.where intermediates
+            time_weight = np.ones(len(days_ago), dtype=np.float32)
+            time_weight[days_ago < 365] = 1.5
+            time_weight[days_ago < 180] = 2.0
         else:
-            df["time_weight"] = 1.0
-
-        df["weighted_severity"] = df["severity"] * df["time_weight"]
-
-        # Aggregate by cell
-        cell_stats = df.groupby("h3_cell").agg(
+            time_weight = 1.0
+
+        # Aggregate a slim three-column frame in a single scan instead of
+        # copying the full GeoDataFrame just to add scratch columns
+        df = pd.DataFrame({
+            "h3_cell": self._cells_to_int(gdf["h3_cell"].to_numpy()),
+            "severity": severity,
+            "weighted_severity": severity * time_weight,
+        })
+        # sort=False skips the post-aggregation key sort, which dominates
+        # groupby time once the cell count grows; downstream merges and
+        # lookups never rely on cell order
+        cell_stats = df.groupby("h3_cell", sort=False).agg(
             crime_count=("h3_cell", "count"),
             total_severity=("severity", "sum"),
             weighted_severity=("weighted_severity", "sum"),
@@ -68,24 +143,39 @@ class CrimeRiskCalculator:
         else:
             cell_stats["crime_risk"] = 0
 
-        # Spatial smoothing: blend with neighbors
-        # Build O(1) lookup dict instead of filtering DataFrame per row
+        # Spatial smoothing: blend with neighbors.
+        # Explode (cell, neighbor) pairs and merge/groupby in pandas C code
+        # instead of a per-row apply with Python-level lookups.
         city_avg = cell_stats["crime_risk"].mean()
-        risk_lookup = dict(zip(cell_stats["h3_cell"], cell_stats["crime_risk"]))
-
-        def get_smoothed(row):
-            cell = row["h3_cell"]
-            own_risk = row["crime_risk"]
-            neighbors = h3.grid_ring(cell, 1)
-            neighbor_scores = [
-                risk_lookup[n] for n in neighbors if n in risk_lookup
-            ]
-            if neighbor_scores:
-                neighbor_avg = sum(neighbor_scores) / len(neighbor_scores)
-                return round(own_risk * 0.7 + neighbor_avg * 0.3, 2)
-            return round(own_risk * 0.7 + city_avg * 0.3, 2)
-
-        cell_stats["smoothed_crime_risk"] = cell_stats.apply(get_smoothed, axis=1)
+
+        cells = cell_stats["h3_cell"].to_numpy()
+        neighbor_lists = [self._neighbor_ring(c) for c in cells]
+        pairs = pd.DataFrame({
+            "h3_cell": np.repeat(cells, [len(n) for n in neighbor_lists]),
+            "neighbor": np.concatenate(neighbor_lists),
+        })
+        pairs = pairs.merge(
+            cell_stats[["h3_cell", "crime_risk"]].rename(columns={
+                "h3_cell": "neighbor", "crime_risk": "neighbor_risk"
+            }),
+            on="neighbor", how="inner"
+        )
+        neighbor_avg = pairs.groupby("h3_cell")["neighbor_risk"].mean()
+
+        # Cells with no scored neighbors fall back to the city average
+        blended = cell_stats["h3_cell"].map(neighbor_avg).fillna(city_avg)
+        cell_stats["smoothed_crime_risk"] = (
+            cell_stats["crime_risk"] * 0.7 + blended * 0.3
+        ).round(2)
+
+        # Restore hex strings at the module boundary: downstream merges
+        # (blend_risks against the crash grid) and JSON exports key on them
+        cell_stats["h3_cell"] = [
+            h3.int_to_str(c) for c in cell_stats["h3_cell"]
+        ]
+
+        if cache_path is not None:
+            cell_stats.to_parquet(cache_path, engine="pyarrow", compression="zstd")
 
         self.grid_data = cell_stats
         return cell_stats
@@ -95,45 +185,59 @@ class CrimeRiskCalculator:
         Calculate crime risk by H3 cell AND time period.
         Same time periods as crash data for consistency.
         """
-        TIME_PERIODS = {
-            "night": (0, 6),
-            "morning_rush": (6, 9),
-            "midday": (9, 16),
-            "evening_rush": (16, 19),
-            "evening": (19, 24)
-        }
-
-        df = gdf.copy()
+        # Same period boundaries as crash data: night [0,6), morning_rush
+        # [6,9), midday [9,16), evening_rush [16,19), evening [19,24)
+        PERIOD_BOUNDS = np.array([0, 6, 9, 16, 19, 24])
+        PERIOD_LABELS = np.array([
+            "night", "morning_rush", "midday", "evening_rush", "evening"
+        ])
+
+        cache_path = self._result_cache_path("crime_time", gdf, h3_resolution)
+        if cache_path is not None and cache_path.exists():
+            print(f"Loading computed crime time patterns from {cache_path}")
+            return pd.read_parquet(cache_path, engine="pyarrow")
+
+        # Shallow copy: the method only adds/rebinds columns, which never
+        # writes through to the caller's blocks, so a deep copy of the
+        # whole GeoDataFrame (geometry included) is wasted bandwidth
+        df = gdf.copy(deep=False)
 
         if "h3_cell" not in df.columns:
-            df["h3_cell"] = df.apply(
-                lambda row: h3.latlng_to_cell(
-                    row.geometry.y, row.geometry.x, h3_resolution
-                ),
-                axis=1
+            lats = df.geometry.y.to_numpy()
+            lngs = df.geometry.x.to_numpy()
+            df["h3_cell"] = np.fromiter(
+                (h3int.latlng_to_cell(lat, lng, h3_resolution)
+                 for lat, lng in zip(lats, lngs)),
+                dtype=np.uint64, count=len(lats)
             )
-
-        def get_period(hour):
-            for period, (start, end) in TIME_PERIODS.items():
-                if start <= hour < end:
-                    return period
-            return "night"
-
-        df["time_period"] = df["hour"].apply(get_period)
-        df["day_type"] = df["day_of_week"].apply(
-            lambda d: "weekend" if d in [5, 6] else "weekday"
+        else:
+            df["h3_cell"] = self._cells_to_int(df["h3_cell"].to_numpy())
+
+        # Vectorized binary search over the period boundaries instead of a
+        # per-row Python scan; unknown hours fall back to night as before
+        hours = df["hour"].fillna(0).to_numpy()
+        idx = np.clip(np.searchsorted(PERIOD_BOUNDS, hours, side="right") - 1, 0, 4)
+        df["time_period"] = PERIOD_LABELS[idx]
+        df["day_type"] = np.where(
+            df["day_of_week"].to_numpy() >= 5, "weekend", "weekday"
         )
 
         # Aggregate
-        cell_time = df.groupby(["h3_cell", "time_period", "day_type"]).agg(
+        cell_time = df.groupby(
+            ["h3_cell", "time_period", "day_type"], sort=False
+        ).agg(
             crime_count=("h3_cell", "count"),
             total_severity=("severity", "sum"),
         ).reset_index()
 
-        # Normalize within each cell
-        cell_time["cell_max_severity"] = cell_time.groupby(
-            "h3_cell"
-        )["total_severity"].transform("max")
+        # Normalize within each cell: aggregate the per-cell max once and
+        # hash-join it back, instead of transform("max")'s broadcast pass
+        cell_max = (
+            cell_time.groupby("h3_cell", sort=False, as_index=False)
+            ["total_severity"].max()
+            .rename(columns={"total_severity": "cell_max_severity"})
+        )
+        cell_time = cell_time.merge(cell_max, on="h3_cell")
 
         cell_time["time_risk_score"] = np.where(
             cell_time["cell_max_severity"] > 0,
@@ -150,6 +254,14 @@ class CrimeRiskCalculator:
         else:
             cell_time["global_risk_score"] = 0
 
+        # Hex strings at the boundary, same as calculate_cell_crime_risk
+        cell_time["h3_cell"] = [
+            h3.int_to_str(c) for c in cell_time["h3_cell"]
+        ]
+
+        if cache_path is not None:
+            cell_time.to_parquet(cache_path, engine="pyarrow", compression="zstd")
+
         return cell_time
 
     @staticmethod
@@ -163,15 +275,16 @@ class CrimeRiskCalculator:
             combined_time: DataFrame with crash + crime time modifiers
         """
         # --- Grid-level merge ---
+        # Column selection already returns new frames, so no extra copies
         crash_cols = crash_grid_df[["h3_cell", "risk_score", "smoothed_risk",
                                     "pedestrian_risk", "cyclist_risk",
-                                    "crash_count", "total_severity"]].copy()
+                                    "crash_count", "total_severity"]]
         crash_cols = crash_cols.rename(columns={
             "total_severity": "crash_severity"
         })
 
         crime_cols = crime_grid_df[["h3_cell", "crime_risk",
-                                     "smoothed_crime_risk", "crime_count"]].copy()
+                                     "smoothed_crime_risk", "crime_count"]]
 
         combined_grid = crash_cols.merge(crime_cols, on="h3_cell", how="outer")
         combined_grid = combined_grid.fillna(0)
@@ -179,12 +292,12 @@ class CrimeRiskCalculator:
         # --- Time-level merge ---
         # Crash time data
         ct = crash_time_df[["h3_cell", "time_period", "day_type",
-                            "global_risk_score"]].copy()
+                            "global_risk_score"]]
         ct = ct.rename(columns={"global_risk_score": "crash_time_score"})
 
         # Crime time data
         crt = crime_time_df[["h3_cell", "time_period", "day_type",
-                             "global_risk_score"]].copy()
+                             "global_risk_score"]]
         crt = crt.rename(columns={"global_risk_score": "crime_time_score"})
 
         combined_time = ct.merge(
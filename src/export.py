@@ -2,21 +2,77 @@
 Risk Data Export Module
 Exports processed risk data in formats for routing and visualization
 """
-import json
+import gzip
+import hashlib
+import shutil
+import orjson
 import geopandas as gpd
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Dict, Any
 from datetime import datetime
 
 
+def _to_float(values) -> list:
+    """Column array -> list of native Python floats in a single C pass."""
+    return np.asarray(values, dtype=float).tolist()
+
+
+def _to_int(values) -> list:
+    """Column array -> list of native Python ints in a single C pass."""
+    return np.asarray(values, dtype=np.int64).tolist()
+
+
 class RiskExporter:
     """Export risk data in various formats for downstream consumers"""
 
-    def __init__(self, output_dir: str = "output", h3_resolution: int = 9):
+    def __init__(
+        self,
+        output_dir: str = "output",
+        h3_resolution: int = 9,
+        compact_json: bool = True,
+        gzip_json: bool = False
+    ):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         self.h3_resolution = h3_resolution
+        # Compact output halves encode time and file size; keep indented
+        # output available for eyeballing during development
+        self.compact_json = compact_json
+        self.gzip_json = gzip_json
+
+    def _routing_signature(
+        self,
+        grid_df: pd.DataFrame,
+        time_df: pd.DataFrame,
+        combined_time_df: pd.DataFrame
+    ) -> str:
+        """Content hash of the routing-export inputs and output settings."""
+        hasher = hashlib.blake2b(digest_size=16)
+        for df in (grid_df, time_df, combined_time_df):
+            if df is not None:
+                hasher.update(
+                    pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()
+                )
+        hasher.update(f"{self.compact_json}|{self.gzip_json}".encode())
+        return hasher.hexdigest()
+
+    def _write_json(self, output_path: Path, output_data: dict) -> Path:
+        """Serialize with orjson, compact and/or gzipped per settings."""
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if not self.compact_json:
+            option |= orjson.OPT_INDENT_2
+        payload = orjson.dumps(output_data, default=str, option=option)
+
+        if self.gzip_json:
+            output_path = output_path.with_suffix(output_path.suffix + ".gz")
+            with gzip.open(output_path, "wb", compresslevel=6) as f:
+                f.write(payload)
+        else:
+            output_path.write_bytes(payload)
+        return output_path
 
     def export_grid_geojson(
         self,
@@ -48,7 +104,7 @@ class RiskExporter:
         if "risk_category" in export_gdf.columns:
             export_gdf["risk_category"] = export_gdf["risk_category"].astype(str)
 
-        export_gdf.to_file(output_path, driver="GeoJSON")
+        export_gdf.to_file(output_path, driver="GeoJSON", engine="pyogrio")
         print(f"Exported grid GeoJSON: {output_path}")
         return str(output_path)
 
@@ -68,7 +124,7 @@ class RiskExporter:
             Path to exported file
         """
         output_path = self.output_dir / filename
-        segments_gdf.to_file(output_path, driver="GeoJSON")
+        segments_gdf.to_file(output_path, driver="GeoJSON", engine="pyogrio")
         print(f"Exported segments GeoJSON: {output_path}")
         return str(output_path)
 
@@ -108,8 +164,7 @@ class RiskExporter:
             "cells": lookup
         }
 
-        with open(output_path, "w") as f:
-            json.dump(output_data, f, indent=2, default=str)
+        output_path = self._write_json(output_path, output_data)
 
         print(f"Exported grid JSON: {output_path}")
         return str(output_path)
@@ -146,21 +201,25 @@ class RiskExporter:
             "cell_time_lookup": {}
         }
 
-        # Create fast lookup for cell-time combinations
+        # Create fast lookup for cell-time combinations. The record dicts
+        # are built by pandas in one C-level to_dict pass; Python only
+        # pivots the flat (cell, key) index into the nested shape.
         if cell_time_df is not None:
             lookup = output_data["cell_time_lookup"]
-            for cell, group in cell_time_df.groupby("h3_cell"):
-                lookup[cell] = {
-                    f"{r['time_period']}_{r['day_type']}": {
-                        "crash_count": int(r["crash_count"]),
-                        "time_risk_score": float(r["time_risk_score"]),
-                        "global_risk_score": float(r["global_risk_score"])
-                    }
-                    for r in group.to_dict("records")
-                }
-
-        with open(output_path, "w") as f:
-            json.dump(output_data, f, indent=2, default=str)
+            key = (
+                cell_time_df["time_period"].astype(str) + "_" +
+                cell_time_df["day_type"].astype(str)
+            )
+            records = (
+                cell_time_df
+                .set_index([cell_time_df["h3_cell"], key])
+                [["crash_count", "time_risk_score", "global_risk_score"]]
+                .to_dict("index")
+            )
+            for (cell, time_key), record in records.items():
+                lookup.setdefault(cell, {})[time_key] = record
+
+        output_path = self._write_json(output_path, output_data)
 
         print(f"Exported time patterns JSON: {output_path}")
         return str(output_path)
@@ -192,62 +251,124 @@ class RiskExporter:
         """
         output_path = self.output_dir / filename
 
-        # Build cells dict from grid in batch (avoid iterrows)
-        grid_records = grid_df.to_dict("records")
-        cells = {}
-        for r in grid_records:
-            severity = r.get("crash_severity", r.get("total_severity", 0))
-            cells[r["h3_cell"]] = {
-                "base_risk": float(r.get("risk_score", 0)),
-                "smoothed_risk": float(r.get("smoothed_risk", r.get("risk_score", 0))),
-                "pedestrian_risk": float(r.get("pedestrian_risk", 0)),
-                "cyclist_risk": float(r.get("cyclist_risk", 0)),
-                "crime_risk": float(r.get("crime_risk", 0)),
-                "smoothed_crime_risk": float(r.get("smoothed_crime_risk", 0)),
-                "crash_count": int(r.get("crash_count", 0)),
-                "crime_count": int(r.get("crime_count", 0)),
-                "total_severity": float(severity),
-                "time_modifiers": {},
-                "crime_time_modifiers": {}
-            }
-
-        # Add crash time modifiers in batch
+        # Re-exports with unchanged inputs reuse the previously serialized
+        # file instead of rebuilding and re-encoding the whole cell dict
+        sig = self._routing_signature(grid_df, time_df, combined_time_df)
+        cache_dir = self.output_dir / ".cache"
+        cached = next(iter(cache_dir.glob(f"routing_{sig}.json*")), None)
+        if cached is not None:
+            if cached.name.endswith(".gz"):
+                output_path = output_path.with_suffix(output_path.suffix + ".gz")
+            shutil.copyfile(cached, output_path)
+            print(f"Exported routing API JSON (cached): {output_path}")
+            return str(output_path)
+
+        # Build cells dict straight from column arrays — avoids the per-row
+        # dict materialization of to_dict("records")
+        n = len(grid_df)
+        zeros = np.zeros(n)
+
+        def _col(name, default=None):
+            if name in grid_df.columns:
+                return grid_df[name].to_numpy()
+            return zeros if default is None else default
+
+        cell_ids = grid_df["h3_cell"].to_numpy()
+        base_risk = _col("risk_score")
+        crime_risk = _col("crime_risk")
+        severity = _col("crash_severity", _col("total_severity"))
+
+        # Compute the time modifiers first, as small per-cell dicts, so
+        # each cell record can be serialized the moment it is assembled
+        base_lookup = dict(zip(cell_ids, base_risk))
+        crime_lookup = dict(zip(cell_ids, crime_risk))
+
+        def _build_modifiers(df, scores, lookup):
+            mods: Dict[str, dict] = {}
+            base = df["h3_cell"].map(lookup).to_numpy(dtype=float)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                modifiers = np.where(base > 0, scores / base, 1.0).round(3)
+            known = ~np.isnan(base)
+            entries = zip(
+                df["h3_cell"].to_numpy(), df["time_period"].to_numpy(),
+                df["day_type"].to_numpy(), modifiers.tolist(), known.tolist()
+            )
+            for cell_id, period, day_type, modifier, in_grid in entries:
+                if in_grid:
+                    mods.setdefault(cell_id, {})[f"{period}_{day_type}"] = modifier
+            return mods
+
+        time_mods: Dict[str, dict] = {}
         if time_df is not None:
-            for cell_id, group in time_df.groupby("h3_cell"):
-                if cell_id not in cells:
-                    continue
-                base = cells[cell_id]["base_risk"]
-                for r in group.to_dict("records"):
-                    key = f"{r['time_period']}_{r['day_type']}"
-                    modifier = (r["global_risk_score"] / base) if base > 0 else 1.0
-                    cells[cell_id]["time_modifiers"][key] = round(modifier, 3)
-
-        # Add crime time modifiers in batch
-        if combined_time_df is not None:
-            for cell_id, group in combined_time_df.groupby("h3_cell"):
-                if cell_id not in cells:
-                    continue
-                crime_base = cells[cell_id]["crime_risk"]
-                for r in group.to_dict("records"):
-                    key = f"{r['time_period']}_{r['day_type']}"
-                    score = r.get("crime_time_score", 0)
-                    modifier = (score / crime_base) if crime_base > 0 else 1.0
-                    cells[cell_id]["crime_time_modifiers"][key] = round(modifier, 3)
+            time_mods = _build_modifiers(
+                time_df, time_df["global_risk_score"].to_numpy(dtype=float),
+                base_lookup
+            )
 
-        output_data = {
-            "metadata": {
-                "type": "routing_risk_api",
-                "generated_at": datetime.now().isoformat(),
-                "total_cells": len(cells),
-                "h3_resolution": self.h3_resolution,
-                "usage": "Walking: risk = crime_risk*0.7 + base_risk*0.3. Driving: risk = base_risk*0.9 + crime_risk*0.1",
-                "has_crime_data": True
-            },
-            "cells": cells
+        crime_mods: Dict[str, dict] = {}
+        if combined_time_df is not None:
+            if "crime_time_score" in combined_time_df.columns:
+                crime_scores = combined_time_df["crime_time_score"].to_numpy(dtype=float)
+            else:
+                crime_scores = np.zeros(len(combined_time_df))
+            crime_mods = _build_modifiers(
+                combined_time_df, crime_scores, crime_lookup
+            )
+
+        metadata = {
+            "type": "routing_risk_api",
+            "generated_at": datetime.now().isoformat(),
+            "total_cells": n,
+            "h3_resolution": self.h3_resolution,
+            "usage": "Walking: risk = crime_risk*0.7 + base_risk*0.3. Driving: risk = base_risk*0.9 + crime_risk*0.1",
+            "has_crime_data": True,
+            "input_signature": sig
         }
 
-        with open(output_path, "w") as f:
-            json.dump(output_data, f, indent=2)
+        # Stream one cell record at a time rather than buffering the whole
+        # cells dict and its serialized form in memory — for large grids
+        # peak RSS no longer scales with a second copy of the payload
+        rows = zip(
+            cell_ids.tolist(), _to_float(base_risk),
+            _to_float(_col("smoothed_risk", base_risk)),
+            _to_float(_col("pedestrian_risk")), _to_float(_col("cyclist_risk")),
+            _to_float(crime_risk), _to_float(_col("smoothed_crime_risk")),
+            _to_int(_col("crash_count")), _to_int(_col("crime_count")),
+            _to_float(severity)
+        )
+
+        if self.gzip_json:
+            output_path = output_path.with_suffix(output_path.suffix + ".gz")
+            sink = gzip.open(output_path, "wb", compresslevel=6)
+        else:
+            sink = open(output_path, "wb")
+
+        with sink as f:
+            f.write(b'{"metadata":' + orjson.dumps(metadata) + b',"cells":{')
+            separator = b""
+            for (cell_id, base, smoothed, ped, cyc,
+                 crime, smoothed_crime, crash_n, crime_n, sev) in rows:
+                record = {
+                    "base_risk": base,
+                    "smoothed_risk": smoothed,
+                    "pedestrian_risk": ped,
+                    "cyclist_risk": cyc,
+                    "crime_risk": crime,
+                    "smoothed_crime_risk": smoothed_crime,
+                    "crash_count": crash_n,
+                    "crime_count": crime_n,
+                    "total_severity": sev,
+                    "time_modifiers": time_mods.get(cell_id, {}),
+                    "crime_time_modifiers": crime_mods.get(cell_id, {})
+                }
+                f.write(separator + orjson.dumps(cell_id) + b":" + orjson.dumps(record))
+                separator = b","
+            f.write(b"}}")
+
+        # Populate the cache for the next identical export
+        cache_dir.mkdir(exist_ok=True)
+        suffix = ".gz" if output_path.name.endswith(".gz") else ""
+        shutil.copyfile(output_path, cache_dir / f"routing_{sig}.json{suffix}")
 
         print(f"Exported routing API JSON: {output_path}")
         return str(output_path)
@@ -259,10 +380,35 @@ class RiskExporter:
     ) -> str:
         """Export intersection risk points as GeoJSON"""
         output_path = self.output_dir / filename
-        intersections_gdf.to_file(output_path, driver="GeoJSON")
+        intersections_gdf.to_file(output_path, driver="GeoJSON", engine="pyogrio")
         print(f"Exported intersections GeoJSON: {output_path}")
         return str(output_path)
 
+    def export_geoparquet(
+        self,
+        gdf: gpd.GeoDataFrame,
+        filename: str
+    ) -> str:
+        """
+        Export a GeoDataFrame as GeoParquet.
+
+        Several times faster to write and reload than GeoJSON and a
+        fraction of the size; meant for downstream geopandas consumers
+        (map-viz tools still get the GeoJSON files).
+        """
+        output_path = self.output_dir / filename
+
+        export_gdf = gdf
+        # Categorical columns round-trip awkwardly for non-pandas readers
+        if "risk_category" in export_gdf.columns:
+            export_gdf = export_gdf.assign(
+                risk_category=export_gdf["risk_category"].astype(str)
+            )
+
+        export_gdf.to_parquet(output_path, compression="snappy")
+        print(f"Exported GeoParquet: {output_path}")
+        return str(output_path)
+
     def export_all(
         self,
         grid_gdf: gpd.GeoDataFrame,
@@ -272,7 +418,8 @@ class RiskExporter:
         period_df: pd.DataFrame,
         cell_time_df: pd.DataFrame,
         combined_grid_df: pd.DataFrame = None,
-        combined_time_df: pd.DataFrame = None
+        combined_time_df: pd.DataFrame = None,
+        include_parquet: bool = True
     ) -> Dict[str, str]:
         """
         Export all data formats at once
@@ -282,9 +429,32 @@ class RiskExporter:
         """
         exports = {}
 
-        exports["grid_geojson"] = self.export_grid_geojson(grid_gdf)
-        exports["segments_geojson"] = self.export_segments_geojson(segments_gdf)
-        exports["intersections_geojson"] = self.export_intersections_geojson(intersections_gdf)
+        # The geometry writes are independent and GDAL/Arrow release the
+        # GIL during I/O, so run them concurrently instead of serially
+        futures = {}
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures["grid_geojson"] = pool.submit(
+                self.export_grid_geojson, grid_gdf
+            )
+            futures["segments_geojson"] = pool.submit(
+                self.export_segments_geojson, segments_gdf
+            )
+            futures["intersections_geojson"] = pool.submit(
+                self.export_intersections_geojson, intersections_gdf
+            )
+            if include_parquet:
+                futures["grid_parquet"] = pool.submit(
+                    self.export_geoparquet, grid_gdf, "grid_risk.parquet"
+                )
+                futures["segments_parquet"] = pool.submit(
+                    self.export_geoparquet, segments_gdf, "segment_risk.parquet"
+                )
+                futures["intersections_parquet"] = pool.submit(
+                    self.export_geoparquet, intersections_gdf,
+                    "intersection_risk.parquet"
+                )
+            for name, future in futures.items():
+                exports[name] = future.result()
 
         # JSON exports need DataFrame without geometry
         grid_df = grid_gdf.drop(columns=["geometry"], errors="ignore")
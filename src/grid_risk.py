@@ -3,10 +3,11 @@ H3 Grid-Based Risk Calculation Module
 Uses Uber's H3 hexagonal grid for spatial aggregation
 """
 import h3
+import h3.api.numpy_int as h3int
 import pandas as pd
 import geopandas as gpd
 import numpy as np
-from shapely.geometry import Polygon
+import shapely
 from typing import Optional
 
 
@@ -22,6 +23,36 @@ class GridRiskCalculator:
         self.resolution = resolution
         self.grid_data: Optional[pd.DataFrame] = None
         self.grid_geo: Optional[gpd.GeoDataFrame] = None
+        # CSR-style ring-1 adjacency over grid_data, built lazily and
+        # shared by smoothing and per-cell neighbor queries
+        self._neighbor_index = None
+        self._cell_pos: dict = {}
+
+    def _build_neighbor_index(self):
+        """
+        Build the ring-1 adjacency for the current grid once: a flat array
+        of neighbor row positions (NaN when the neighbor has no data) plus
+        CSR offsets, so every neighbor query is array indexing instead of
+        a fresh h3.grid_ring call.
+        """
+        cells = self.grid_data["h3_cell"].to_numpy()
+        n = len(cells)
+        cells_int = np.fromiter(
+            (h3.str_to_int(c) for c in cells), dtype=np.uint64, count=n
+        )
+        neighbor_lists = [h3int.grid_ring(c, 1) for c in cells_int]
+        counts = np.fromiter(
+            (len(l) for l in neighbor_lists), dtype=np.intp, count=n
+        )
+        flat = (np.concatenate(neighbor_lists) if n
+                else np.array([], dtype=np.uint64))
+        positions = pd.Series(
+            np.arange(n), index=cells_int
+        ).reindex(flat).to_numpy(dtype=float)
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        self._neighbor_index = (positions, offsets)
+        self._cell_pos = {c: i for i, c in enumerate(cells)}
+        return self._neighbor_index
 
     def assign_h3_cells(self, gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
         """
@@ -33,15 +64,16 @@ class GridRiskCalculator:
         Returns:
             GeoDataFrame with h3_cell column added
         """
+        # Iterate raw coordinate arrays instead of DataFrame.apply, which
+        # boxes every row into a Series (h3-py has no array API yet)
+        lats = gdf.geometry.y.to_numpy()
+        lngs = gdf.geometry.x.to_numpy()
+        resolution = self.resolution
         gdf = gdf.copy()
-        gdf["h3_cell"] = gdf.apply(
-            lambda row: h3.latlng_to_cell(
-                row.geometry.y,
-                row.geometry.x,
-                self.resolution
-            ),
-            axis=1
-        )
+        gdf["h3_cell"] = [
+            h3.latlng_to_cell(lat, lng, resolution)
+            for lat, lng in zip(lats, lngs)
+        ]
         return gdf
 
     def calculate_cell_risk(
@@ -62,20 +94,37 @@ class GridRiskCalculator:
         if "h3_cell" not in gdf.columns:
             gdf = self.assign_h3_cells(gdf)
 
-        df = gdf.copy()
+        severity = gdf["severity"].to_numpy(dtype=float)
 
         # Time decay: crashes in last 6 months weighted 2x, last year 1.5x
-        if time_weighted and "crash_datetime" in df.columns:
+        if time_weighted and "crash_datetime" in gdf.columns:
             now = pd.Timestamp.now()
-            days_ago = (now - df["crash_datetime"]).dt.days
-            df["time_weight"] = np.where(
-                days_ago < 180, 2.0,
-                np.where(days_ago < 365, 1.5, 1.0)
-            )
+            days_ago = (now - gdf["crash_datetime"]).dt.days.to_numpy()
+            # Fill one buffer with masked writes instead of allocating two
+            # full-length np.where intermediates
+            time_weight = np.ones(len(days_ago), dtype=np.float32)
+            time_weight[days_ago < 365] = 1.5
+            time_weight[days_ago < 180] = 2.0
         else:
-            df["time_weight"] = 1.0
-
-        df["weighted_severity"] = df["severity"] * df["time_weight"]
+            time_weight = 1.0
+
+        # Aggregate a slim frame of just the grouped columns instead of
+        # deep-copying the full GeoDataFrame to hold two scratch columns
+        df = pd.DataFrame({
+            "h3_cell": gdf["h3_cell"].to_numpy(),
+            "severity": severity,
+            "weighted_severity": severity * time_weight,
+            "number_of_persons_injured": gdf["number_of_persons_injured"].to_numpy(),
+            "number_of_persons_killed": gdf["number_of_persons_killed"].to_numpy(),
+            "number_of_pedestrians_injured": gdf["number_of_pedestrians_injured"].to_numpy(),
+            "number_of_pedestrians_killed": gdf["number_of_pedestrians_killed"].to_numpy(),
+            "number_of_cyclist_injured": gdf["number_of_cyclist_injured"].to_numpy(),
+            "number_of_cyclist_killed": gdf["number_of_cyclist_killed"].to_numpy(),
+            # Precomputed crash flags let the groupby use the C-level sum
+            # instead of dispatching a Python lambda per group
+            "ped_flag": (gdf["number_of_pedestrians_injured"].to_numpy() > 0).astype(np.int32),
+            "cyc_flag": (gdf["number_of_cyclist_injured"].to_numpy() > 0).astype(np.int32),
+        })
 
         # Aggregate by cell
         cell_stats = df.groupby("h3_cell").agg(
@@ -89,8 +138,8 @@ class GridRiskCalculator:
             pedestrian_killed=("number_of_pedestrians_killed", "sum"),
             cyclist_injured=("number_of_cyclist_injured", "sum"),
             cyclist_killed=("number_of_cyclist_killed", "sum"),
-            pedestrian_crashes=("number_of_pedestrians_injured", lambda x: (x > 0).sum()),
-            cyclist_crashes=("number_of_cyclist_injured", lambda x: (x > 0).sum())
+            pedestrian_crashes=("ped_flag", "sum"),
+            cyclist_crashes=("cyc_flag", "sum")
         ).reset_index()
 
         # Normalize risk score (0-100 scale)
@@ -124,15 +173,19 @@ class GridRiskCalculator:
             if max_cyc > 0 else 0
         )
 
-        # Risk category
-        cell_stats["risk_category"] = pd.cut(
-            cell_stats["risk_score"],
-            bins=[0, 20, 40, 60, 80, 100],
-            labels=["very_low", "low", "medium", "high", "critical"],
-            include_lowest=True
-        )
+        # Risk category: binary-search the bin edges and index a label
+        # array — same right-closed bins as pd.cut without the Categorical
+        # allocation, and scores of exactly 0 still land in very_low
+        edges = np.array([20, 40, 60, 80])
+        labels = np.array(["very_low", "low", "medium", "high", "critical"])
+        cell_stats["risk_category"] = labels[
+            np.searchsorted(edges, cell_stats["risk_score"].to_numpy())
+        ]
 
         self.grid_data = cell_stats
+        # New grid, new adjacency
+        self._neighbor_index = None
+        self._cell_pos = {}
         return cell_stats
 
     def create_grid_geodataframe(self) -> gpd.GeoDataFrame:
@@ -145,28 +198,37 @@ class GridRiskCalculator:
         if self.grid_data is None:
             raise ValueError("No grid data. Call calculate_cell_risk() first.")
 
-        def h3_to_polygon(h3_cell):
-            """Convert H3 cell to Shapely polygon"""
-            boundary = h3.cell_to_boundary(h3_cell)
-            # h3 returns (lat, lng), shapely needs (lng, lat)
-            coords = [(lng, lat) for lat, lng in boundary]
-            return Polygon(coords)
+        cells = self.grid_data["h3_cell"].to_numpy()
+
+        # Fetch each boundary once, then hand shapely 2.0 the flattened
+        # coordinate buffer so every ring/polygon is built at the C level
+        # instead of one Python Polygon.__init__ per cell
+        boundaries = [h3.cell_to_boundary(c) for c in cells]
+        counts = np.fromiter(
+            (len(b) for b in boundaries), dtype=np.intp, count=len(boundaries)
+        )
+        # h3 returns (lat, lng), shapely needs (lng, lat)
+        coords = np.ascontiguousarray(
+            np.concatenate(boundaries)[:, ::-1]
+        )
+        rings = shapely.linearrings(
+            coords, indices=np.repeat(np.arange(len(cells)), counts)
+        )
+        geometry = shapely.polygons(rings)
 
         grid_with_geo = self.grid_data.copy()
-        grid_with_geo["geometry"] = grid_with_geo["h3_cell"].apply(h3_to_polygon)
+        grid_with_geo["geometry"] = geometry
         self.grid_geo = gpd.GeoDataFrame(
             grid_with_geo,
             geometry="geometry",
             crs="EPSG:4326"
         )
 
-        # Add cell center for labeling
-        self.grid_geo["center_lat"] = self.grid_geo["h3_cell"].apply(
-            lambda x: h3.cell_to_latlng(x)[0]
-        )
-        self.grid_geo["center_lng"] = self.grid_geo["h3_cell"].apply(
-            lambda x: h3.cell_to_latlng(x)[1]
-        )
+        # Add cell center for labeling: one lookup per cell, assigned as
+        # two column slices of the stacked (lat, lng) array
+        centers = np.array([h3.cell_to_latlng(c) for c in cells])
+        self.grid_geo["center_lat"] = centers[:, 0]
+        self.grid_geo["center_lng"] = centers[:, 1]
 
         return self.grid_geo
 
@@ -183,17 +245,29 @@ class GridRiskCalculator:
         if self.grid_data is None:
             return {}
 
-        neighbors = h3.grid_ring(h3_cell, 1)
-        neighbor_data = self.grid_data[
-            self.grid_data["h3_cell"].isin(neighbors)
-        ]
-
-        cell_data = self.grid_data[self.grid_data["h3_cell"] == h3_cell]
+        if self._neighbor_index is None:
+            self._build_neighbor_index()
+        risk = self.grid_data["risk_score"].to_numpy(dtype=float)
+
+        i = self._cell_pos.get(h3_cell)
+        if i is not None:
+            # Slice this cell's row out of the cached adjacency
+            positions, offsets = self._neighbor_index
+            row = positions[offsets[i]:offsets[i + 1]]
+            neighbor_idx = row[~np.isnan(row)].astype(np.intp)
+            cell_risk = float(risk[i])
+        else:
+            # Cell outside the grid: resolve its ring against the index
+            neighbor_idx = np.array([
+                self._cell_pos[n]
+                for n in h3.grid_ring(h3_cell, 1) if n in self._cell_pos
+            ], dtype=np.intp)
+            cell_risk = 0
 
         return {
-            "cell_risk": float(cell_data["risk_score"].iloc[0]) if len(cell_data) > 0 else 0,
-            "neighbor_avg_risk": float(neighbor_data["risk_score"].mean()) if len(neighbor_data) > 0 else 0,
-            "neighbor_count": len(neighbor_data)
+            "cell_risk": cell_risk,
+            "neighbor_avg_risk": float(risk[neighbor_idx].mean()) if len(neighbor_idx) > 0 else 0,
+            "neighbor_count": int(len(neighbor_idx))
         }
 
     def get_high_risk_cells(self, threshold: float = 60) -> gpd.GeoDataFrame:
@@ -218,29 +292,30 @@ class GridRiskCalculator:
 
         city_avg = self.grid_data["risk_score"].mean()
 
-        # Build O(1) lookup dict instead of filtering DataFrame per row
-        risk_lookup = dict(zip(
-            self.grid_data["h3_cell"],
-            self.grid_data["risk_score"]
-        ))
-
-        def get_smoothed_risk(row):
-            cell = row["h3_cell"]
-            own_risk = row["risk_score"]
-
-            neighbors = h3.grid_ring(cell, 1)
-            neighbor_scores = [
-                risk_lookup[n] for n in neighbors if n in risk_lookup
-            ]
-
-            if neighbor_scores:
-                neighbor_avg = sum(neighbor_scores) / len(neighbor_scores)
-                return round(own_risk * 0.7 + neighbor_avg * 0.3, 2)
-            else:
-                return round(own_risk * 0.7 + city_avg * fallback_pct, 2)
-
-        self.grid_data["smoothed_risk"] = self.grid_data.apply(
-            get_smoothed_risk, axis=1
+        own = self.grid_data["risk_score"].to_numpy(dtype=float)
+        fallback = city_avg * fallback_pct
+
+        if len(own) == 0:
+            self.grid_data["smoothed_risk"] = own
+            return self.grid_data
+
+        # Gather neighbor risks through the cached adjacency, then reduce
+        # per cell — a pure array pipeline with no per-neighbor Python.
+        # Unknown neighbors (NaN positions) drop out of the means.
+        positions, offsets = (
+            self._neighbor_index or self._build_neighbor_index()
+        )
+        known = ~np.isnan(positions)
+        gather = np.where(known, positions, 0).astype(np.intp)
+        neighbor_risk = np.where(known, own[gather], 0.0)
+        sums = np.add.reduceat(neighbor_risk, offsets[:-1])
+        hits = np.add.reduceat(known.astype(np.float64), offsets[:-1])
+
+        neighbor_term = np.where(
+            hits > 0,
+            (sums / np.maximum(hits, 1)) * 0.3,
+            fallback
         )
+        self.grid_data["smoothed_risk"] = np.round(own * 0.7 + neighbor_term, 2)
 
         return self.grid_data
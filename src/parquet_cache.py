@@ -0,0 +1,22 @@
+"""
+Shared parquet cache reader for the ingestion modules.
+"""
+import pandas as pd
+import pyarrow.parquet
+
+
+def read_cached_parquet(path, columns) -> pd.DataFrame:
+    """
+    Read a cached parquet file with column pushdown.
+
+    The requested columns are intersected with the file's actual schema:
+    caches written before a column was added to SELECT_COLS (or where an
+    all-null column never made it into the file) still load instead of
+    raising ArrowInvalid on the missing name.
+    """
+    present = set(pyarrow.parquet.read_schema(path).names)
+    return pd.read_parquet(
+        path,
+        engine="pyarrow",
+        columns=[c for c in columns if c in present]
+    )
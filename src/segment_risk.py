@@ -5,7 +5,8 @@ Maps crashes to street segments for routing integration
 import pandas as pd
 import geopandas as gpd
 import numpy as np
-from shapely.geometry import LineString, Point, box
+import shapely
+from shapely.geometry import LineString
 from shapely.ops import linemerge
 from typing import Optional, Tuple
 from collections import defaultdict
@@ -28,12 +29,20 @@ class SegmentRiskMapper:
         Returns:
             DataFrame with per-street statistics
         """
-        df = gdf.copy()
+        # Shallow copy: only new columns are added below, and the UNKNOWN
+        # filter materializes a fresh frame anyway
+        df = gdf.copy(deep=False)
 
         # Clean street names
         df["street_clean"] = df["on_street_name"].fillna("UNKNOWN").str.upper().str.strip()
         df = df[df["street_clean"] != "UNKNOWN"]
 
+        # Extract coordinates once (vectorized through shapely 2.0), so
+        # the groupby reductions below run as plain NumPy min/max instead
+        # of per-group Python lambdas touching every geometry object
+        df["lat"] = df.geometry.y.to_numpy()
+        df["lng"] = df.geometry.x.to_numpy()
+
         # Aggregate by street
         street_stats = df.groupby("street_clean").agg(
             crash_count=("street_clean", "count"),
@@ -41,21 +50,22 @@ class SegmentRiskMapper:
             avg_severity=("severity", "mean"),
             total_injured=("number_of_persons_injured", "sum"),
             total_killed=("number_of_persons_killed", "sum"),
-            min_lat=("geometry", lambda x: x.apply(lambda g: g.y).min()),
-            max_lat=("geometry", lambda x: x.apply(lambda g: g.y).max()),
-            min_lng=("geometry", lambda x: x.apply(lambda g: g.x).min()),
-            max_lng=("geometry", lambda x: x.apply(lambda g: g.x).max()),
+            min_lat=("lat", "min"),
+            max_lat=("lat", "max"),
+            min_lng=("lng", "min"),
+            max_lng=("lng", "max"),
             # Get list of crash points for segment creation
             crash_points=("geometry", list)
         ).reset_index()
 
-        # Calculate segment length (approximate in meters)
-        street_stats["approx_length_m"] = street_stats.apply(
-            lambda row: self._haversine_distance(
-                row["min_lat"], row["min_lng"],
-                row["max_lat"], row["max_lng"]
-            ),
-            axis=1
+        # Calculate segment length (approximate in meters). The haversine
+        # helper is pure NumPy, so passing the column arrays broadcasts
+        # the trig across every street in one call instead of a row apply
+        street_stats["approx_length_m"] = self._haversine_distance(
+            street_stats["min_lat"].to_numpy(),
+            street_stats["min_lng"].to_numpy(),
+            street_stats["max_lat"].to_numpy(),
+            street_stats["max_lng"].to_numpy()
         )
 
         # Risk per km (normalized)
@@ -74,10 +84,11 @@ class SegmentRiskMapper:
         self.street_data = street_stats
         return street_stats
 
-    def _haversine_distance(
-        self, lat1: float, lon1: float, lat2: float, lon2: float
-    ) -> float:
-        """Calculate distance between two points in meters"""
+    def _haversine_distance(self, lat1, lon1, lat2, lon2):
+        """
+        Calculate distance between two points in meters.
+        Pure NumPy, so it accepts scalars or broadcasts over arrays.
+        """
         R = 6371000  # Earth radius in meters
 
         phi1 = np.radians(lat1)
@@ -101,41 +112,56 @@ class SegmentRiskMapper:
         if self.street_data is None:
             raise ValueError("No street data. Call aggregate_by_street() first.")
 
-        segments = []
-
-        for _, row in self.street_data.iterrows():
-            crash_points = row["crash_points"]
-
-            if len(crash_points) >= 2:
-                # Sort points by longitude to create a rough line
-                sorted_points = sorted(crash_points, key=lambda p: (p.x, p.y))
-                coords = [(p.x, p.y) for p in sorted_points]
-
-                # Simplify to start and end for clean segment
-                if len(coords) > 2:
-                    # Use convex hull endpoints for better representation
-                    line = LineString(coords)
-                    simplified = line.simplify(0.0001)
-                    geometry = simplified
-                else:
-                    geometry = LineString(coords)
-            else:
-                # Single point - create small buffer line
-                p = crash_points[0]
-                geometry = LineString([(p.x - 0.0001, p.y), (p.x + 0.0001, p.y)])
-
-            segments.append({
-                "street_name": row["street_clean"],
-                "crash_count": row["crash_count"],
-                "risk_score": row["risk_score"],
-                "total_severity": row["total_severity"],
-                "total_injured": row["total_injured"],
-                "total_killed": row["total_killed"],
-                "crashes_per_km": round(row["crashes_per_km"], 2),
-                "geometry": geometry
-            })
-
-        self.segment_geo = gpd.GeoDataFrame(segments, crs="EPSG:4326")
+        street_data = self.street_data
+        point_lists = street_data["crash_points"].tolist()
+        n_streets = len(point_lists)
+
+        if n_streets == 0:
+            self.segment_geo = gpd.GeoDataFrame(
+                columns=["street_name", "geometry"], crs="EPSG:4326"
+            )
+            return self.segment_geo
+
+        # Flatten every street's points into one coordinate buffer and
+        # sort within each street by (x, y) with a single lexsort, so all
+        # LineStrings are built by one vectorized shapely call instead of
+        # a Python loop with per-street sorted()/LineString()
+        counts = np.fromiter(
+            (len(pts) for pts in point_lists), dtype=np.intp, count=n_streets
+        )
+        indices = np.repeat(np.arange(n_streets), counts)
+        coords = shapely.get_coordinates(
+            np.concatenate([np.asarray(pts, dtype=object) for pts in point_lists])
+        )
+        order = np.lexsort((coords[:, 1], coords[:, 0], indices))
+        coords = coords[order]
+
+        # Single-point streets become a short synthetic west-east segment:
+        # duplicate their row and nudge the two copies apart in longitude
+        single = counts == 1
+        repeats = np.where(single[indices], 2, 1)
+        coords = np.repeat(coords, repeats, axis=0)
+        line_indices = np.repeat(indices, repeats)
+        duplicated = single[line_indices]
+        nudge = np.empty(int(duplicated.sum()))
+        nudge[0::2] = -0.0001
+        nudge[1::2] = 0.0001
+        coords[duplicated, 0] += nudge
+
+        # Simplify is a no-op for two-point lines, so apply it uniformly
+        geometry = shapely.simplify(
+            shapely.linestrings(coords, indices=line_indices), 0.0001
+        )
+
+        self.segment_geo = gpd.GeoDataFrame({
+            "street_name": street_data["street_clean"].to_numpy(),
+            "crash_count": street_data["crash_count"].to_numpy(),
+            "risk_score": street_data["risk_score"].to_numpy(),
+            "total_severity": street_data["total_severity"].to_numpy(),
+            "total_injured": street_data["total_injured"].to_numpy(),
+            "total_killed": street_data["total_killed"].to_numpy(),
+            "crashes_per_km": street_data["crashes_per_km"].round(2).to_numpy(),
+        }, geometry=geometry, crs="EPSG:4326")
         return self.segment_geo
 
     def create_intersection_risk(
@@ -160,25 +186,36 @@ class SegmentRiskMapper:
         df["on_street"] = df["on_street_name"].fillna("").str.upper().str.strip()
         df["cross_street"] = df["cross_street_name"].str.upper().str.strip()
 
-        # Create canonical intersection ID (sorted street names)
-        df["intersection_id"] = df.apply(
-            lambda row: tuple(sorted([row["on_street"], row["cross_street"]])),
-            axis=1
+        # Create canonical intersection ID (sorted street names) with two
+        # elementwise selects instead of building a tuple per row
+        on = df["on_street"].to_numpy()
+        cross = df["cross_street"].to_numpy()
+        swap = on < cross
+        first = np.where(swap, on, cross)
+        second = np.where(swap, cross, on)
+        df["intersection_id"] = np.char.add(
+            np.char.add(first.astype(str), "|"), second.astype(str)
         )
 
+        # Coordinates as plain columns so the groupby means below are
+        # NumPy reductions, not per-group geometry-attribute loops
+        df["lat"] = df.geometry.y.to_numpy()
+        df["lng"] = df.geometry.x.to_numpy()
+
         # Aggregate by intersection
         intersection_stats = df.groupby("intersection_id").agg(
             crash_count=("intersection_id", "count"),
             total_severity=("severity", "sum"),
             total_injured=("number_of_persons_injured", "sum"),
             total_killed=("number_of_persons_killed", "sum"),
-            center_lat=("geometry", lambda x: x.apply(lambda g: g.y).mean()),
-            center_lng=("geometry", lambda x: x.apply(lambda g: g.x).mean())
+            center_lat=("lat", "mean"),
+            center_lng=("lng", "mean")
         ).reset_index()
 
-        # Unpack intersection tuple to strings
-        intersection_stats["street_1"] = intersection_stats["intersection_id"].apply(lambda x: x[0])
-        intersection_stats["street_2"] = intersection_stats["intersection_id"].apply(lambda x: x[1])
+        # Unpack the delimited ID back into the two street name columns
+        streets = intersection_stats["intersection_id"].str.split("|", n=1, expand=True)
+        intersection_stats["street_1"] = streets[0]
+        intersection_stats["street_2"] = streets[1]
 
         # Normalize risk
         max_severity = intersection_stats["total_severity"].quantile(0.99)
@@ -186,14 +223,12 @@ class SegmentRiskMapper:
             intersection_stats["total_severity"].clip(upper=max_severity) / max_severity * 100
         ).round(2)
 
-        # Create point geometries
-        geometry = [
-            Point(lng, lat)
-            for lng, lat in zip(
-                intersection_stats["center_lng"],
-                intersection_stats["center_lat"]
-            )
-        ]
+        # Create point geometries with the vectorized constructor — one C
+        # call instead of a Python Point.__init__ per intersection
+        geometry = shapely.points(
+            intersection_stats["center_lng"].to_numpy(),
+            intersection_stats["center_lat"].to_numpy()
+        )
 
         intersection_gdf = gpd.GeoDataFrame(
             intersection_stats.drop(columns=["intersection_id"]),
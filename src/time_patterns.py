@@ -2,11 +2,14 @@
 Time-of-Day Risk Pattern Analysis
 Analyzes how crash risk varies by hour, day, and season
 """
+import hashlib
 import pandas as pd
 import geopandas as gpd
 import numpy as np
+from pathlib import Path
 from typing import Optional, Dict, List
 import h3
+import h3.api.numpy_int as h3int
 
 
 class TimePatternAnalyzer:
@@ -26,10 +29,83 @@ class TimePatternAnalyzer:
         "weekend": [5, 6]            # Sat-Sun
     }
 
-    def __init__(self):
+    # TIME_PERIODS flattened into bin edges/labels for vectorized pd.cut
+    _HOUR_BINS = np.array([0, 6, 9, 16, 19, 24])
+    _HOUR_LABELS = ["night", "morning_rush", "midday", "evening_rush", "evening"]
+
+    def _assign_time_period(self, hours: pd.Series) -> pd.Categorical:
+        """Bin hours into TIME_PERIODS in one C-level pass (no per-row apply).
+
+        Missing hours fall into "night", matching the old scan's fallback.
+        """
+        return pd.cut(
+            hours.fillna(0),
+            bins=self._HOUR_BINS,
+            labels=self._HOUR_LABELS,
+            right=False,
+            include_lowest=True
+        )
+
+    # Below this row count the aggregations are cheaper than a cache probe
+    _MIN_CACHE_ROWS = 10_000
+
+    def __init__(self, cache_dir: Optional[str] = None):
         self.hourly_risk: Optional[pd.DataFrame] = None
         self.period_risk: Optional[pd.DataFrame] = None
         self.cell_time_risk: Optional[pd.DataFrame] = None
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Keyed lookups built alongside the frames so the per-query methods
+        # are O(1) probes instead of full-frame boolean filters. Hourly
+        # multipliers live in a fixed 24-slot array (NaN = hour absent)
+        self._hourly_mult = np.full(24, np.nan)
+        self._period_index: Dict = {}
+        self._cell_time_index: Dict = {}
+
+    def _result_cache_path(self, kind: str, gdf: gpd.GeoDataFrame, *extra) -> Optional[Path]:
+        """Cache path for a computed result, or None when caching is off.
+
+        The aggregations are pure functions of the crash frame, so a cheap
+        fingerprint (row count + datetime range + parameters) stands in for
+        hashing the data itself. Small frames skip the cache entirely.
+        """
+        if self.cache_dir is None or len(gdf) <= self._MIN_CACHE_ROWS:
+            return None
+        if "crash_datetime" not in gdf.columns:
+            return None
+        fingerprint = "|".join(str(part) for part in (
+            kind, len(gdf),
+            gdf["crash_datetime"].min(), gdf["crash_datetime"].max(),
+            *extra
+        ))
+        key = hashlib.blake2b(fingerprint.encode(), digest_size=16).hexdigest()
+        return self.cache_dir / f"{kind}_{key}.parquet"
+
+    def _set_hourly_risk(self, hourly: pd.DataFrame) -> None:
+        self.hourly_risk = hourly
+        self._hourly_mult = np.full(24, np.nan)
+        self._hourly_mult[hourly["hour"].to_numpy(np.intp)] = (
+            hourly["risk_multiplier"].to_numpy()
+        )
+
+    def _set_period_risk(self, period_stats: pd.DataFrame) -> None:
+        self.period_risk = period_stats
+        self._period_index = {
+            (str(row.time_period), str(row.day_type)): float(row.risk_multiplier)
+            for row in period_stats.itertuples(index=False)
+        }
+
+    def _set_cell_time_risk(self, cell_time: pd.DataFrame) -> None:
+        self.cell_time_risk = cell_time
+        self._cell_time_index = {
+            (row.h3_cell, str(row.time_period), str(row.day_type)): (
+                int(row.crash_count),
+                float(row.time_risk_score),
+                float(row.global_risk_score)
+            )
+            for row in cell_time.itertuples(index=False)
+        }
 
     def calculate_hourly_risk(self, gdf: gpd.GeoDataFrame) -> pd.DataFrame:
         """
@@ -41,10 +117,13 @@ class TimePatternAnalyzer:
         Returns:
             DataFrame with hourly risk multipliers
         """
-        df = gdf.copy()
+        cache_path = self._result_cache_path("tp_hourly", gdf)
+        if cache_path is not None and cache_path.exists():
+            self._set_hourly_risk(pd.read_parquet(cache_path))
+            return self.hourly_risk
 
-        # Aggregate by hour
-        hourly = df.groupby("hour").agg(
+        # Read-only aggregation — no need to copy the frame
+        hourly = gdf.groupby("hour").agg(
             crash_count=("hour", "count"),
             total_severity=("severity", "sum"),
             avg_severity=("severity", "mean")
@@ -62,7 +141,10 @@ class TimePatternAnalyzer:
             hourly["risk_multiplier"].max() * 100
         ).round(2)
 
-        self.hourly_risk = hourly
+        if cache_path is not None:
+            hourly.to_parquet(cache_path)
+
+        self._set_hourly_risk(hourly)
         return hourly
 
     def calculate_period_risk(self, gdf: gpd.GeoDataFrame) -> pd.DataFrame:
@@ -75,36 +157,51 @@ class TimePatternAnalyzer:
         Returns:
             DataFrame with period/day risk combinations
         """
-        df = gdf.copy()
+        cache_path = self._result_cache_path("tp_period", gdf)
+        if cache_path is not None and cache_path.exists():
+            self._set_period_risk(pd.read_parquet(cache_path))
+            return self.period_risk
+
+        # Only five columns feed this aggregation; copying just those skips
+        # duplicating the geometry and the rest of the crash attributes
+        df = gdf[[
+            "hour", "day_of_week", "severity",
+            "number_of_pedestrians_injured", "number_of_cyclist_injured"
+        ]].copy()
 
         # Assign time period
-        def get_period(hour):
-            for period, (start, end) in self.TIME_PERIODS.items():
-                if start <= hour < end:
-                    return period
-            return "night"
-
-        df["time_period"] = df["hour"].apply(get_period)
+        df["time_period"] = self._assign_time_period(df["hour"])
 
         # Assign day type
-        df["day_type"] = df["day_of_week"].apply(
-            lambda d: "weekend" if d in self.DAY_TYPES["weekend"] else "weekday"
+        # Saturday/Sunday are codes 5-6, so one vectorized comparison maps
+        # straight onto categorical codes — no per-row lambda or list scan
+        df["day_type"] = pd.Categorical.from_codes(
+            (df["day_of_week"].to_numpy() >= 5).astype(np.int8),
+            categories=["weekday", "weekend"]
         )
 
+        # Involvement flags computed once up front so the groupby sums run
+        # as native reductions instead of a Python lambda per group
+        df["_ped_inv"] = (df["number_of_pedestrians_injured"].to_numpy() > 0).astype(np.int32)
+        df["_cyc_inv"] = (df["number_of_cyclist_injured"].to_numpy() > 0).astype(np.int32)
+
         # Aggregate by period + day type
-        period_stats = df.groupby(["time_period", "day_type"]).agg(
+        period_stats = df.groupby(["time_period", "day_type"], observed=True, sort=False).agg(
             crash_count=("time_period", "count"),
             total_severity=("severity", "sum"),
             avg_severity=("severity", "mean"),
-            pedestrian_involved=("number_of_pedestrians_injured", lambda x: (x > 0).sum()),
-            cyclist_involved=("number_of_cyclist_injured", lambda x: (x > 0).sum())
+            pedestrian_involved=("_ped_inv", "sum"),
+            cyclist_involved=("_cyc_inv", "sum")
         ).reset_index()
 
         # Risk multiplier
         baseline = period_stats["crash_count"].mean()
         period_stats["risk_multiplier"] = (period_stats["crash_count"] / baseline).round(3)
 
-        self.period_risk = period_stats
+        if cache_path is not None:
+            period_stats.to_parquet(cache_path)
+
+        self._set_period_risk(period_stats)
         return period_stats
 
     def calculate_cell_time_risk(
@@ -123,60 +220,96 @@ class TimePatternAnalyzer:
         Returns:
             DataFrame with cell-time risk combinations
         """
-        df = gdf.copy()
-
-        # Assign H3 cells
+        cache_path = self._result_cache_path("tp_cell_time", gdf, h3_resolution)
+        if cache_path is not None and cache_path.exists():
+            self._set_cell_time_risk(pd.read_parquet(cache_path))
+            return self.cell_time_risk
+
+        # A four-column working frame is all the aggregation touches;
+        # coordinates are pulled straight off the geometry when needed
+        base_cols = [c for c in ("h3_cell", "hour", "day_of_week", "severity")
+                     if c in gdf.columns]
+        df = gdf[base_cols].copy()
+
+        # Assign H3 cells. The numpy_int interface hands back uint64 ids,
+        # which group far faster than strings; coordinates come out of the
+        # geometry column in two bulk arrays rather than per-row attribute
+        # access through .apply. Cells are restored to hex only on the
+        # (much smaller) aggregated frame below.
+        restore_hex = False
         if "h3_cell" not in df.columns:
-            df["h3_cell"] = df.apply(
-                lambda row: h3.latlng_to_cell(
-                    row.geometry.y,
-                    row.geometry.x,
-                    h3_resolution
-                ),
-                axis=1
+            lats = gdf.geometry.y.to_numpy()
+            lngs = gdf.geometry.x.to_numpy()
+            df["h3_cell"] = np.fromiter(
+                (h3int.latlng_to_cell(lat, lng, h3_resolution)
+                 for lat, lng in zip(lats, lngs)),
+                dtype=np.uint64,
+                count=len(df)
             )
+            restore_hex = True
 
         # Assign time period
-        def get_period(hour):
-            for period, (start, end) in self.TIME_PERIODS.items():
-                if start <= hour < end:
-                    return period
-            return "night"
-
-        df["time_period"] = df["hour"].apply(get_period)
-        df["day_type"] = df["day_of_week"].apply(
-            lambda d: "weekend" if d in self.DAY_TYPES["weekend"] else "weekday"
+        df["time_period"] = self._assign_time_period(df["hour"])
+        # Saturday/Sunday are codes 5-6, so one vectorized comparison maps
+        # straight onto categorical codes — no per-row lambda or list scan
+        df["day_type"] = pd.Categorical.from_codes(
+            (df["day_of_week"].to_numpy() >= 5).astype(np.int8),
+            categories=["weekday", "weekend"]
         )
 
-        # Create compound key
-        df["cell_time_key"] = (
-            df["h3_cell"] + "_" +
-            df["time_period"] + "_" +
-            df["day_type"]
-        )
-
-        # Aggregate
-        cell_time = df.groupby(["h3_cell", "time_period", "day_type"]).agg(
-            crash_count=("h3_cell", "count"),
-            total_severity=("severity", "sum"),
-            avg_severity=("severity", "mean")
-        ).reset_index()
+        # Aggregate. All three keys are categorical by here (time_period and
+        # day_type already are), so their integer codes fuse into one group
+        # id per row and the count/sum/mean reductions become two bincount
+        # passes over preallocated arrays — no hash-aggregation machinery
+        df["h3_cell"] = df["h3_cell"].astype("category")
+        cell_codes = df["h3_cell"].cat.codes.to_numpy()
+        period_codes = df["time_period"].cat.codes.to_numpy()
+        day_codes = df["day_type"].cat.codes.to_numpy()
+        n_periods = len(self._HOUR_LABELS)
+        ids = (cell_codes.astype(np.int64) * n_periods + period_codes) * 2 + day_codes
+
+        uniq, inv = np.unique(ids, return_inverse=True)
+        severity = df["severity"].to_numpy(np.float64)
+        counts = np.bincount(inv)
+        totals = np.bincount(inv, weights=severity)
+
+        cell_time = pd.DataFrame({
+            "h3_cell": df["h3_cell"].cat.categories[uniq // (n_periods * 2)],
+            "time_period": np.asarray(self._HOUR_LABELS)[(uniq // 2) % n_periods],
+            "day_type": np.where(uniq % 2 == 1, "weekend", "weekday"),
+            "crash_count": counts,
+            "total_severity": totals,
+            "avg_severity": totals / counts
+        })
 
         # Normalize risk within each cell (shows relative danger by time)
-        cell_time["cell_max_severity"] = cell_time.groupby("h3_cell")["total_severity"].transform("max")
+        # Aggregate once and map back by key — cheaper than transform, which
+        # re-runs the group machinery just to broadcast the result
+        cell_maxes = cell_time.groupby("h3_cell", sort=False)["total_severity"].max()
+        cell_time["cell_max_severity"] = cell_time["h3_cell"].map(cell_maxes)
+
+        # Both scores come off the same total-severity buffer in one fused
+        # pass — no Series temporaries for the clip/divide/round chain
+        cms = cell_time["cell_max_severity"].to_numpy(np.float64)
+        global_max = np.quantile(totals, 0.99)
         cell_time["time_risk_score"] = np.where(
-            cell_time["cell_max_severity"] > 0,
-            (cell_time["total_severity"] / cell_time["cell_max_severity"] * 100).round(2),
-            0
+            cms > 0,
+            np.round(totals / np.where(cms > 0, cms, 1.0) * 100, 2),
+            0.0
         )
-
         # Global risk score (comparable across cells)
-        global_max = cell_time["total_severity"].quantile(0.99)
-        cell_time["global_risk_score"] = (
-            cell_time["total_severity"].clip(upper=global_max) / global_max * 100
-        ).round(2)
+        cell_time["global_risk_score"] = np.round(
+            np.minimum(totals, global_max) / global_max * 100, 2
+        )
 
-        self.cell_time_risk = cell_time
+        # Hand hex ids back to callers (exports and the router key on them)
+        if restore_hex:
+            cell_time["h3_cell"] = [h3.int_to_str(c) for c in cell_time["h3_cell"]]
+
+        if cache_path is not None:
+            cell_time.to_parquet(cache_path)
+
+        self._set_cell_time_risk(cell_time)
         return cell_time
 
     def get_risk_for_time(
@@ -196,11 +329,9 @@ class TimePatternAnalyzer:
         """
         result = {"hour": hour, "is_weekend": is_weekend}
 
-        # Hourly multiplier
-        if self.hourly_risk is not None:
-            hourly = self.hourly_risk[self.hourly_risk["hour"] == hour]
-            if len(hourly) > 0:
-                result["hourly_multiplier"] = float(hourly["risk_multiplier"].iloc[0])
+        # Hourly multiplier — O(1) slot read from the prebuilt array
+        if 0 <= hour < 24 and not np.isnan(self._hourly_mult[hour]):
+            result["hourly_multiplier"] = float(self._hourly_mult[hour])
 
         # Period multiplier
         if self.period_risk is not None:
@@ -211,13 +342,9 @@ class TimePatternAnalyzer:
                     break
 
             day_type = "weekend" if is_weekend else "weekday"
-            period_data = self.period_risk[
-                (self.period_risk["time_period"] == period) &
-                (self.period_risk["day_type"] == day_type)
-            ]
-
-            if len(period_data) > 0:
-                result["period_multiplier"] = float(period_data["risk_multiplier"].iloc[0])
+            multiplier = self._period_index.get((period, day_type))
+            if multiplier is not None:
+                result["period_multiplier"] = multiplier
                 result["time_period"] = period
                 result["day_type"] = day_type
 
@@ -240,7 +367,7 @@ class TimePatternAnalyzer:
         Get specific cell's risk for a time period
 
         Args:
-            h3_cell: H3 cell ID
+            h3_cell: H3 cell ID (hex string or uint64 int)
             time_period: One of TIME_PERIODS keys
             day_type: "weekday" or "weekend"
 
@@ -250,13 +377,14 @@ class TimePatternAnalyzer:
         if self.cell_time_risk is None:
             return {"found": False}
 
-        match = self.cell_time_risk[
-            (self.cell_time_risk["h3_cell"] == h3_cell) &
-            (self.cell_time_risk["time_period"] == time_period) &
-            (self.cell_time_risk["day_type"] == day_type)
-        ]
+        # Callers holding raw uint64 ids (the internal representation)
+        # don't need to pre-convert; the index keys on hex strings
+        if not isinstance(h3_cell, str):
+            h3_cell = h3.int_to_str(h3_cell)
+
+        match = self._cell_time_index.get((h3_cell, time_period, day_type))
 
-        if len(match) == 0:
+        if match is None:
             return {
                 "found": False,
                 "h3_cell": h3_cell,
@@ -264,29 +392,39 @@ class TimePatternAnalyzer:
                 "day_type": day_type
             }
 
-        row = match.iloc[0]
+        crash_count, time_risk_score, global_risk_score = match
         return {
             "found": True,
             "h3_cell": h3_cell,
             "time_period": time_period,
             "day_type": day_type,
-            "crash_count": int(row["crash_count"]),
-            "time_risk_score": float(row["time_risk_score"]),
-            "global_risk_score": float(row["global_risk_score"])
+            "crash_count": crash_count,
+            "time_risk_score": time_risk_score,
+            "global_risk_score": global_risk_score
         }
 
+    def _top_periods(self, top_n: int, descending: bool) -> List[Dict]:
+        """Select top_n periods by multiplier via argpartition (O(N), no
+        full sort) and return them as records in rank order."""
+        multipliers = self.period_risk["risk_multiplier"].to_numpy(np.float64)
+        if descending:
+            multipliers = -multipliers
+        k = min(top_n, len(multipliers))
+        if k < len(multipliers):
+            idx = np.argpartition(multipliers, k - 1)[:k]
+        else:
+            idx = np.arange(len(multipliers))
+        idx = idx[np.argsort(multipliers[idx], kind="stable")]
+        return self.period_risk.iloc[idx].to_dict("records")
+
     def get_safest_times(self, top_n: int = 3) -> List[Dict]:
         """Get the safest time periods overall"""
         if self.period_risk is None:
             return []
-
-        safest = self.period_risk.nsmallest(top_n, "risk_multiplier")
-        return safest.to_dict("records")
+        return self._top_periods(top_n, descending=False)
 
     def get_peak_danger_times(self, top_n: int = 3) -> List[Dict]:
         """Get the most dangerous time periods"""
         if self.period_risk is None:
             return []
-
-        dangerous = self.period_risk.nlargest(top_n, "risk_multiplier")
-        return dangerous.to_dict("records")
+        return self._top_periods(top_n, descending=True)
@@ -4,18 +4,18 @@ Walking Buddy – Gemini-powered conversational walking companion.
 Provides a friendly chat experience that naturally integrates
 navigation directions and safety alerts from the geospatial risk data.
 """
-import json
 import math
 import os
+import re
+import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 import h3
-
-try:
-    from google import genai
-except ImportError:
-    genai = None
+import h3.api.numpy_int as h3int
+import numpy as np
+import orjson
 
 
 # ── Helpers ──────────────────────────────────────────────────────────────
@@ -31,25 +31,57 @@ def _haversine(lat1, lng1, lat2, lng2):
     return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
 
-def _bearing(lat1, lng1, lat2, lng2):
-    """Compass bearing from point 1 to point 2."""
+_COMPASS = ["north", "northeast", "east", "southeast",
+            "south", "southwest", "west", "northwest"]
+
+
+def _bearing(lat1, lng1, lat2, lng2) -> int:
+    """Compass index (0-7) from point 1 to point 2; _COMPASS names it."""
     rlat1, rlat2 = math.radians(lat1), math.radians(lat2)
     dlng = math.radians(lng2 - lng1)
     x = math.sin(dlng) * math.cos(rlat2)
     y = (math.cos(rlat1) * math.sin(rlat2)
          - math.sin(rlat1) * math.cos(rlat2) * math.cos(dlng))
     deg = (math.degrees(math.atan2(x, y)) + 360) % 360
-    dirs = ["north", "northeast", "east", "southeast",
-            "south", "southwest", "west", "northwest"]
-    return dirs[int((deg + 22.5) / 45) % 8]
+    return int((deg + 22.5) / 45) % 8
+
+
+def _bearing_indices(latlng: np.ndarray) -> np.ndarray:
+    """Compass indices (0-7) for every consecutive pair of an (N,2) array.
+
+    One vectorized trig pass over the whole polyline; integer indices keep
+    the direction-change test an int compare, with _COMPASS translating to
+    a label only when an event is emitted.
+    """
+    lat = np.radians(latlng[:, 0])
+    lng = np.radians(latlng[:, 1])
+    dlng = np.diff(lng)
+    x = np.sin(dlng) * np.cos(lat[1:])
+    y = (np.cos(lat[:-1]) * np.sin(lat[1:])
+         - np.sin(lat[:-1]) * np.cos(lat[1:]) * np.cos(dlng))
+    deg = (np.degrees(np.arctan2(x, y)) + 360) % 360
+    return (((deg + 22.5) // 45) % 8).astype(np.int8)
+
+
+@lru_cache(maxsize=512)
+def _h3_line_cached(origin_cell: str, dest_cell: str) -> tuple[str, ...]:
+    """Memoized grid path for one origin/destination pair.
+
+    The path walk is deterministic, so repeat requests for the same pair
+    (demo loops, tests) become a cache probe; the tuple keeps the cached
+    value immutable.
+    """
+    # Interned ids alias the RiskMap keys, so route cells cost a
+    # pointer each and dict probes short-circuit on identity
+    return tuple(sys.intern(c) for c in h3.grid_path_cells(origin_cell, dest_cell))
 
 
 def _h3_line(origin_cell: str, dest_cell: str) -> list[str]:
     """Return an ordered list of H3 cells forming a path."""
     try:
-        return h3.grid_path_cells(origin_cell, dest_cell)
+        return list(_h3_line_cached(origin_cell, dest_cell))
     except Exception:
-        return [origin_cell, dest_cell]
+        return [sys.intern(origin_cell), sys.intern(dest_cell)]
 
 
 # ── Risk loader ──────────────────────────────────────────────────────────
@@ -61,29 +93,106 @@ class RiskMap:
         path = Path(risk_file)
         if not path.exists():
             raise FileNotFoundError(f"Risk data not found: {path}")
-        with open(path) as f:
-            data = json.load(f)
-        self.cells: dict = data.get("cells", {})
+        # orjson decodes the multi-MB risk export straight from bytes,
+        # skipping stdlib json's intermediate unicode pass
+        data = orjson.loads(path.read_bytes())
+        # Intern the ids: every route cell and lookup key then shares one
+        # string object per cell instead of a fresh 15-char str each
+        self.cells: dict = {
+            sys.intern(k): v for k, v in data.get("cells", {}).items()
+        }
         self.resolution: int = data.get("metadata", {}).get("h3_resolution", 9)
+        # Fold the 70/30 blend into flat score and label tables in one
+        # pass over the cells, so the per-cell hot paths are bare dict
+        # probes and guidance steps never re-derive either
+        self._walking_risk: dict = {}
+        self._cell_label: dict = {}
+        for cid, c in self.cells.items():
+            crime = c.get("smoothed_crime_risk", c.get("crime_risk", 0))
+            crash = c.get("smoothed_risk", c.get("base_risk", 0))
+            score = round(crime * 0.7 + crash * 0.3, 2)
+            self._walking_risk[cid] = score
+            self._cell_label[cid] = self.risk_label(score)
+        self._build_soa()
+
+    def _build_soa(self) -> None:
+        """Structure-of-arrays view of the walking scores.
+
+        Cell ids become sorted uint64 H3 indexes with a parallel float32
+        score column, so bulk queries are a binary search over packed
+        integers instead of one dict probe per string id.
+        """
+        n = len(self._walking_risk)
+        ids = np.fromiter(
+            (h3.str_to_int(k) for k in self._walking_risk),
+            dtype=np.uint64, count=n
+        )
+        order = np.argsort(ids)
+        self._ids = ids[order]
+        scores = np.fromiter(
+            self._walking_risk.values(), dtype=np.float32, count=n
+        )
+        self._scores = scores[order]
+        # Half-point quantized copy (score*2 in a byte): a quarter of the
+        # float bandwidth for threshold counts over large routes
+        self._walking_q = np.clip(
+            np.round(self._scores * 2.0), 0, 200
+        ).astype(np.uint8)
 
     def risk_for(self, cell_id: str) -> dict:
         return self.cells.get(cell_id, {})
 
+    def _bulk_indices(self, cell_ids):
+        """Row indexes plus hit mask for a batch of cell ids.
+
+        Accepts hex strings or a ready uint64 array; callers that hold
+        integer ids (Route) skip the per-id hex parse entirely.
+        """
+        if isinstance(cell_ids, np.ndarray) and cell_ids.dtype == np.uint64:
+            qids = cell_ids
+        else:
+            qids = np.fromiter(
+                (h3.str_to_int(c) for c in cell_ids),
+                dtype=np.uint64, count=len(cell_ids)
+            )
+        idxs = np.minimum(
+            np.searchsorted(self._ids, qids), len(self._ids) - 1
+        )
+        return idxs, self._ids[idxs] == qids
+
+    def walking_risk_bulk(self, cell_ids) -> np.ndarray:
+        """Walking risk for many cells as one float array.
+
+        Unknown cells score 0.0, matching the scalar walking_risk.
+        """
+        if len(self._ids) == 0 or len(cell_ids) == 0:
+            return np.zeros(len(cell_ids), dtype=np.float32)
+        idxs, hits = self._bulk_indices(cell_ids)
+        return np.where(hits, self._scores[idxs], np.float32(0.0))
+
+    def walking_quant_bulk(self, cell_ids) -> np.ndarray:
+        """Quantized walking risk (uint8, half points: score * 2) in bulk."""
+        if len(self._ids) == 0 or len(cell_ids) == 0:
+            return np.zeros(len(cell_ids), dtype=np.uint8)
+        idxs, hits = self._bulk_indices(cell_ids)
+        return np.where(hits, self._walking_q[idxs], np.uint8(0))
+
     def walking_risk(self, cell_id: str) -> float:
         """Combined walking risk: 70 % crime + 30 % crash."""
-        c = self.risk_for(cell_id)
-        if not c:
-            return 0.0
-        crime = c.get("smoothed_crime_risk", c.get("crime_risk", 0))
-        crash = c.get("smoothed_risk", c.get("base_risk", 0))
-        return round(crime * 0.7 + crash * 0.3, 2)
+        return self._walking_risk.get(cell_id, 0.0)
+
+    def label_for(self, cell_id: str) -> str:
+        """Precomputed risk label for a cell (unknown cells are low-risk)."""
+        return self._cell_label.get(cell_id, "low-risk")
 
     def risk_label(self, score: float) -> str:
-        if score >= 70:
-            return "high-risk"
-        if score >= 40:
-            return "moderate-risk"
-        return "low-risk"
+        # Table lookup over the 201 half-point buckets; truncation keeps
+        # the integer 40/70 thresholds exact
+        return _QLABELS[int(min(max(score, 0.0), 100.0) * 2)]
+
+
+# One label per quantized half-point value: <40 low, <70 moderate, else high
+_QLABELS = ["low-risk"] * 80 + ["moderate-risk"] * 60 + ["high-risk"] * 61
 
 
 # ── Route ────────────────────────────────────────────────────────────────
@@ -95,6 +204,37 @@ class Route:
         self.cells = cells
         self.risk_map = risk_map
         self.current_idx = 0
+        # Parse each hex id to its uint64 H3 index once; every later
+        # C-boundary crossing (centroids, bulk risk queries) then works
+        # on packed integers instead of re-parsing strings
+        self._cell_ids = np.fromiter(
+            (h3.str_to_int(c) for c in cells),
+            dtype=np.uint64, count=len(cells)
+        )
+        # Each centroid is needed up to three times across advance calls
+        # (as next, current, then previous) — compute them once up front
+        self._latlng = np.array(
+            [h3int.cell_to_latlng(i) for i in self._cell_ids], dtype=np.float64
+        ).reshape(len(cells), 2)
+        self._bearings = _bearing_indices(self._latlng)
+        # Cumulative metres along the polyline in one vectorized pass.
+        # Consecutive res-9 cells sit ~150 m apart, so an equirectangular
+        # projection (accurate to <0.1 % at that scale) replaces the full
+        # spherical haversine — one cos and a hypot per segment
+        phi = np.radians(self._latlng[:, 0])
+        lam = np.radians(self._latlng[:, 1])
+        dphi = np.diff(phi)
+        dlam = np.diff(lam)
+        lat_m = (phi[:-1] + phi[1:]) * 0.5
+        seg = np.hypot(6_371_000 * dlam * np.cos(lat_m), 6_371_000 * dphi)
+        self._cum = np.concatenate([[0.0], np.cumsum(seg)])
+        # Quarter-way marks by distance walked rather than cell count,
+        # resolved once so advance checks progress with a dict probe
+        total = float(self._cum[-1])
+        self._milestones = {
+            int(np.searchsorted(self._cum, p * total)): int(p * 100)
+            for p in (0.25, 0.5, 0.75)
+        } if total > 0 else {}
 
     @property
     def total_cells(self) -> int:
@@ -113,21 +253,15 @@ class Route:
         if self.finished:
             return {"type": "arrived", "message": "You've arrived at your destination!"}
 
-        prev = self.cells[self.current_idx]
         self.current_idx += 1
         curr = self.cells[self.current_idx]
 
         events = []
 
-        # Direction change?
+        # Direction change? An int compare of precomputed compass indices
         if self.current_idx + 1 < len(self.cells):
-            nxt = self.cells[self.current_idx + 1]
-            lat_c, lng_c = h3.cell_to_latlng(curr)
-            lat_n, lng_n = h3.cell_to_latlng(nxt)
-            lat_p, lng_p = h3.cell_to_latlng(prev)
-            old_dir = _bearing(lat_p, lng_p, lat_c, lng_c)
-            new_dir = _bearing(lat_c, lng_c, lat_n, lng_n)
-            if old_dir != new_dir:
+            if self._bearings[self.current_idx - 1] != self._bearings[self.current_idx]:
+                new_dir = _COMPASS[self._bearings[self.current_idx]]
                 events.append({
                     "type": "turn",
                     "direction": new_dir,
@@ -135,18 +269,16 @@ class Route:
                 })
 
         # Risk change?
-        risk = self.risk_map.walking_risk(curr)
-        label = self.risk_map.risk_label(risk)
+        label = self.risk_map.label_for(curr)
         if label == "high-risk":
             events.append({
                 "type": "danger",
-                "risk_score": risk,
+                "risk_score": self.risk_map.walking_risk(curr),
                 "message": "Heads up — you're entering a higher-risk area. Stay alert and stick to well-lit paths."
             })
 
         # Progress milestone
-        pct = int(self.current_idx / (len(self.cells) - 1) * 100)
-        if pct in (25, 50, 75) and pct == int((self.current_idx) / (len(self.cells) - 1) * 100):
+        if (pct := self._milestones.get(self.current_idx)) is not None:
             events.append({
                 "type": "progress",
                 "percent": pct,
@@ -163,10 +295,14 @@ class Route:
 
     def summary(self) -> str:
         """Human-readable route summary."""
-        risks = [self.risk_map.walking_risk(c) for c in self.cells]
-        avg = sum(risks) / len(risks) if risks else 0
-        high = sum(1 for r in risks if r >= 70)
-        est_m = len(self.cells) * 150  # rough estimate ~150m per cell at res 9
+        # One bulk lookup and two C-level reductions instead of a Python
+        # loop of scalar walking_risk calls per cell
+        risks = self.risk_map.walking_risk_bulk(self._cell_ids)
+        avg = float(risks.mean(dtype=np.float64)) if len(risks) else 0
+        # Byte-wide threshold count (140 == 70 * 2); the float scores
+        # above stay around only for the human-readable average
+        high = int((self.risk_map.walking_quant_bulk(self._cell_ids) >= 140).sum())
+        est_m = int(self._cum[-1])  # true polyline length, precomputed
         est_min = max(1, round(est_m / 80))  # ~80 m/min walking
         parts = [
             f"Route: {len(self.cells)} segments, ~{est_m}m (~{est_min} min walk).",
@@ -216,11 +352,15 @@ class WalkingBuddy:
         api_key: str | None = None,
         resolution: int = 9,
     ):
-        if genai is None:
+        # Imported here rather than at module level so callers that only
+        # want Route/RiskMap never pay the SDK's import cost
+        try:
+            from google import genai
+        except ImportError as exc:
             raise ImportError(
                 "google-genai package is required. "
                 "Install it with: pip install google-genai"
-            )
+            ) from exc
 
         key = api_key or os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
         if not key:
@@ -231,6 +371,13 @@ class WalkingBuddy:
 
         self.client = genai.Client(api_key=key)
         self.model = "gemini-2.0-flash"
+        # One server-side chat session for the whole walk: each turn ships
+        # only the newest message instead of replaying the system prompt
+        # plus the entire history
+        self.chat_session = self.client.chats.create(
+            model=self.model,
+            config={"system_instruction": SYSTEM_PROMPT},
+        )
         self.resolution = resolution
 
         # Load risk data
@@ -245,6 +392,7 @@ class WalkingBuddy:
         self.state = STATE_IDLE
         self.route: Optional[Route] = None
         self.history: list[dict] = []
+        self._max_history = 12
         self._step_counter = 0
 
     # ── Route planning ───────────────────────────────────────────────
@@ -300,16 +448,18 @@ class WalkingBuddy:
             else user_message
         )
 
-        # Build message history for Gemini
+        # The session holds the conversation server-side; self.history is
+        # just a local shadow transcript for inspection
         self.history.append({"role": "user", "parts": [{"text": augmented_message}]})
 
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=[{"role": "user", "parts": [{"text": SYSTEM_PROMPT}]}] + self.history,
-        )
+        response = self.chat_session.send_message(augmented_message)
 
         reply = response.text.strip()
         self.history.append({"role": "model", "parts": [{"text": reply}]})
+        # Keep the shadow transcript a sliding window so memory stays
+        # flat over an arbitrarily long walk
+        if len(self.history) > self._max_history:
+            self.history = self.history[-self._max_history:]
 
         return reply
 
@@ -328,16 +478,18 @@ class WalkingBuddy:
 
 # ── Helpers ──────────────────────────────────────────────────────────────
 
+# All start triggers as one case-insensitive alternation, compiled once:
+# a single scan of the message instead of one substring pass per trigger
+_START_RE = re.compile(
+    r"\b(?:guide me|let'?s go|start(?: walking)?|lead the way|walk(?:ing)?"
+    r"|go ahead|ready|sure|yes|yep|yeah?|ok(?:ay)?)\b",
+    re.IGNORECASE
+)
+
+
 def _wants_to_start(msg: str) -> bool:
     """Detect if the user wants to start walking / get guided."""
-    triggers = [
-        "guide me", "let's go", "lets go", "start walking", "start",
-        "lead the way", "ok let's go", "okay let's go", "yeah let's go",
-        "walk", "go ahead", "ready", "sure", "yes", "yep", "yea", "yeah",
-        "ok", "okay"
-    ]
-    lower = msg.lower().strip()
-    return any(t in lower for t in triggers)
+    return _START_RE.search(msg) is not None
 
 
 class _DummyRiskMap:
@@ -350,5 +502,14 @@ class _DummyRiskMap:
     def walking_risk(self, cell_id):
         return 0.0
 
+    def walking_risk_bulk(self, cell_ids):
+        return np.zeros(len(cell_ids), dtype=np.float32)
+
+    def walking_quant_bulk(self, cell_ids):
+        return np.zeros(len(cell_ids), dtype=np.uint8)
+
+    def label_for(self, cell_id):
+        return "unknown"
+
     def risk_label(self, score):
         return "unknown"
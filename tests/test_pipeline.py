@@ -3,12 +3,13 @@ Unit tests for the geospatial risk pipeline.
 Uses synthetic data — no network or cache required.
 """
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 import geopandas as gpd
-from shapely.geometry import Point
+import pytest
 
 # Allow imports from project root
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -52,8 +53,11 @@ def make_crash_gdf(n: int = 200) -> gpd.GeoDataFrame:
     df["day_of_week"] = df["crash_datetime"].dt.dayofweek
     df["month"] = df["crash_datetime"].dt.month
     df["severity"] = df["number_of_persons_killed"] * 10 + df["number_of_persons_injured"] * 2 + 1
-    geometry = [Point(x, y) for x, y in zip(df["longitude"], df["latitude"])]
-    return gpd.GeoDataFrame(df, geometry=geometry, crs="EPSG:4326")
+    return gpd.GeoDataFrame(
+        df,
+        geometry=gpd.points_from_xy(df["longitude"], df["latitude"]),
+        crs="EPSG:4326"
+    )
 
 
 def make_crime_gdf(n: int = 150) -> gpd.GeoDataFrame:
@@ -70,8 +74,44 @@ def make_crime_gdf(n: int = 150) -> gpd.GeoDataFrame:
     })
     df["hour"] = df["crime_datetime"].dt.hour
     df["day_of_week"] = df["crime_datetime"].dt.dayofweek
-    geometry = [Point(x, y) for x, y in zip(df["longitude"], df["latitude"])]
-    return gpd.GeoDataFrame(df, geometry=geometry, crs="EPSG:4326")
+    return gpd.GeoDataFrame(
+        df,
+        geometry=gpd.points_from_xy(df["longitude"], df["latitude"]),
+        crs="EPSG:4326"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Shared fixtures — grid/crime risk is deterministic, so compute it once
+# for the whole module instead of per test
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def _crash_calc_cached():
+    gdf = make_crash_gdf()
+    calc = GridRiskCalculator(resolution=8)
+    gdf = calc.assign_h3_cells(gdf)
+    calc.calculate_cell_risk(gdf, time_weighted=False)
+    return calc, gdf
+
+
+@lru_cache(maxsize=None)
+def _crime_calc_cached():
+    gdf = make_crime_gdf()
+    calc = CrimeRiskCalculator(resolution=8)
+    gdf = calc.assign_h3_cells(gdf)
+    result = calc.calculate_cell_crime_risk(gdf, time_weighted=False)
+    return calc, gdf, result
+
+
+@pytest.fixture(scope="module")
+def crash_calc():
+    return _crash_calc_cached()
+
+
+@pytest.fixture(scope="module")
+def crime_calc():
+    return _crime_calc_cached()
 
 
 # ---------------------------------------------------------------------------
@@ -93,42 +133,30 @@ def test_severity_no_double_counting():
 # Tests — Grid Risk
 # ---------------------------------------------------------------------------
 
-def test_grid_risk_scores_range():
+def test_grid_risk_scores_range(crash_calc):
     """All risk scores should be in [0, 100]."""
-    gdf = make_crash_gdf()
-    calc = GridRiskCalculator(resolution=8)
-    gdf = calc.assign_h3_cells(gdf)
-    calc.calculate_cell_risk(gdf, time_weighted=False)
+    calc, _ = crash_calc
     assert calc.grid_data["risk_score"].min() >= 0
     assert calc.grid_data["risk_score"].max() <= 100
 
 
-def test_grid_risk_category_no_nan():
+def test_grid_risk_category_no_nan(crash_calc):
     """No cell should have NaN risk category (pd.cut include_lowest fix)."""
-    gdf = make_crash_gdf()
-    calc = GridRiskCalculator(resolution=8)
-    gdf = calc.assign_h3_cells(gdf)
-    calc.calculate_cell_risk(gdf, time_weighted=False)
+    calc, _ = crash_calc
     nan_count = calc.grid_data["risk_category"].isna().sum()
     assert nan_count == 0, f"{nan_count} cells have NaN risk_category"
 
 
-def test_spatial_smoothing_adds_column():
+def test_spatial_smoothing_adds_column(crash_calc):
     """apply_spatial_smoothing should produce a smoothed_risk column."""
-    gdf = make_crash_gdf()
-    calc = GridRiskCalculator(resolution=8)
-    gdf = calc.assign_h3_cells(gdf)
-    calc.calculate_cell_risk(gdf, time_weighted=False)
+    calc, _ = crash_calc
     calc.apply_spatial_smoothing()
     assert "smoothed_risk" in calc.grid_data.columns
 
 
-def test_grid_geodataframe_does_not_mutate():
+def test_grid_geodataframe_does_not_mutate(crash_calc):
     """create_grid_geodataframe should NOT add geometry to grid_data."""
-    gdf = make_crash_gdf()
-    calc = GridRiskCalculator(resolution=8)
-    gdf = calc.assign_h3_cells(gdf)
-    calc.calculate_cell_risk(gdf, time_weighted=False)
+    calc, _ = crash_calc
     calc.create_grid_geodataframe()
     assert "geometry" not in calc.grid_data.columns, (
         "grid_data was mutated with geometry column"
@@ -139,12 +167,9 @@ def test_grid_geodataframe_does_not_mutate():
 # Tests — Crime Risk
 # ---------------------------------------------------------------------------
 
-def test_crime_risk_scores_range():
+def test_crime_risk_scores_range(crime_calc):
     """Crime risk scores should be in [0, 100]."""
-    gdf = make_crime_gdf()
-    calc = CrimeRiskCalculator(resolution=8)
-    gdf = calc.assign_h3_cells(gdf)
-    result = calc.calculate_cell_crime_risk(gdf, time_weighted=False)
+    _, _, result = crime_calc
     assert result["crime_risk"].min() >= 0
     assert result["crime_risk"].max() <= 100
 
@@ -236,11 +261,14 @@ def test_blend_risks_outer_join():
 # ---------------------------------------------------------------------------
 
 if __name__ == "__main__":
+    import inspect
+
+    _fixture_values = {"crash_calc": _crash_calc_cached, "crime_calc": _crime_calc_cached}
     tests = [v for k, v in sorted(globals().items()) if k.startswith("test_")]
     passed = failed = 0
     for fn in tests:
         try:
-            fn()
+            fn(*(_fixture_values[p]() for p in inspect.signature(fn).parameters))
             print(f"  PASS  {fn.__name__}")
             passed += 1
         except Exception as e:
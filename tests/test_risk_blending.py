@@ -2,40 +2,131 @@
 Tests for the risk blending logic used in routing.
 Tests the _get_blended_risk calculation without loading the full road network.
 """
+from typing import NamedTuple
+
+import numpy as np
 import pytest
 
 
 # --- Replicate the blending logic for unit testing ---
 # (Avoids loading OSMnx graph which takes minutes)
 
+# Shared fallback for cells without modifier dicts (mirrors routing_engine)
+_EMPTY = {}
+
+# Fused multiply-add on Python 3.13+, mirroring routing_engine
+try:
+    from math import fma as _fma
+except ImportError:
+    def _fma(x, y, z):
+        return x * y + z
+
+
+def _blend_scalar(crash_base, crash_mod, crime_base, crime_mod, wc, wr, has_crime,
+                  _fma=_fma):
+    """Mirror of routing_engine._blend_scalar"""
+    if not crash_base and not crime_base:
+        return 0.0
+    crash_risk = crash_base * crash_mod
+    if crime_base == 0 and not has_crime:
+        return crash_risk
+    return _fma(wc, crash_risk, wr * (crime_base * crime_mod))
+
+
+# Default (crash_mod, crime_mod) pair for absent time keys
+_ONES = (1.0, 1.0)
+
+# Identical modifier profiles share one table (mirrors routing_engine)
+_MODIFIER_POOL = {}
+
+
+class CellInfo(NamedTuple):
+    """Mirror of routing_engine.CellInfo (merged modifier table)"""
+    base_risk: float = 0.0
+    crime_risk: float = 0.0
+    modifiers: dict = _EMPTY
+
+    @classmethod
+    def from_dict(cls, d):
+        tm = d.get("time_modifiers") or _EMPTY
+        ctm = d.get("crime_time_modifiers") or _EMPTY
+        merged = {
+            tk: (tm.get(tk, 1.0), ctm.get(tk, 1.0))
+            for tk in tm.keys() | ctm.keys()
+        } if (tm or ctm) else _EMPTY
+        if merged is not _EMPTY:
+            merged = _MODIFIER_POOL.setdefault(frozenset(merged.items()), merged)
+        return cls(d.get("base_risk", 0), d.get("crime_risk", 0), merged)
+
 MODE_WEIGHTS = {
     "walking":  {"crash": 0.3, "crime": 0.7},
     "driving":  {"crash": 0.9, "crime": 0.1},
     "cycling":  {"crash": 0.5, "crime": 0.5},
 }
 
+# Integer mode ids with a tuple of (crash, crime) pairs, mirroring
+# RoutingEngine._MODE_IDS / _WEIGHTS_BY_ID; walking (id 0) is the
+# unknown-mode fallback
+_MODE_IDS = {k: i for i, k in enumerate(MODE_WEIGHTS)}
+_WEIGHTS_BY_ID = tuple((v["crash"], v["crime"]) for v in MODE_WEIGHTS.values())
 
-def get_blended_risk(cell_info, time_key, travel_mode="walking", has_crime_data=True):
-    """Mirror of RoutingEngine._get_blended_risk for testing"""
-    weights = MODE_WEIGHTS.get(travel_mode, MODE_WEIGHTS["walking"])
 
-    crash_base = cell_info.get("base_risk", 0)
-    crash_mod = cell_info.get("time_modifiers", {}).get(time_key, 1.0)
-    crash_risk = crash_base * crash_mod
+# Per-mode weight sums, computed and validated once at import
+# (mirrors the invariant asserted in routing_engine)
+_MODE_WEIGHT_SUMS = tuple(v["crash"] + v["crime"] for v in MODE_WEIGHTS.values())
+assert all(abs(s - 1.0) < 1e-9 for s in _MODE_WEIGHT_SUMS)
 
-    crime_base = cell_info.get("crime_risk", 0)
-    crime_mod = cell_info.get("crime_time_modifiers", {}).get(time_key, 1.0)
-    crime_risk = crime_base * crime_mod
 
-    if crime_base == 0 and not has_crime_data:
-        return crash_risk
+def resolve_mode(name):
+    """Mode name -> integer id; unknown names resolve to walking."""
+    return _MODE_IDS.get(name, 0)
 
-    return (weights["crash"] * crash_risk) + (weights["crime"] * crime_risk)
+
+def get_blended_risk(cell_info, time_key, travel_mode="walking", has_crime_data=True,
+                     _weights=_WEIGHTS_BY_ID, _ids=_MODE_IDS):
+    """Mirror of RoutingEngine._get_blended_risk for testing"""
+    wc, wr = _weights[_ids.get(travel_mode, 0)]
+
+    crash_mod, crime_mod = cell_info.modifiers.get(time_key, _ONES)
+    return _blend_scalar(
+        cell_info.base_risk, crash_mod,
+        cell_info.crime_risk, crime_mod,
+        wc, wr, has_crime_data,
+    )
+
+
+def get_blended_risk_batch(cells, time_key, travel_mode="walking", has_crime_data=True,
+                           _weights=_WEIGHTS_BY_ID, _ids=_MODE_IDS):
+    """Mirror of RoutingEngine._get_blended_risk_batch for testing"""
+    wc, wr = _weights[_ids.get(travel_mode, 0)]
+    n = len(cells)
+    base = np.fromiter(
+        (c.base_risk for c in cells), dtype=np.float32, count=n
+    )
+    crime = np.fromiter(
+        (c.crime_risk for c in cells), dtype=np.float32, count=n
+    )
+    pairs = np.fromiter(
+        (c.modifiers.get(time_key, _ONES) for c in cells),
+        dtype=np.dtype((np.float32, 2)), count=n
+    ).reshape(n, 2)
+    crash_mod = np.ascontiguousarray(pairs[:, 0])
+    crime_mod = np.ascontiguousarray(pairs[:, 1])
+    crash_risk = np.multiply(base, crash_mod)
+    blended = np.multiply(crime, crime_mod)
+    blended *= wr
+    if has_crime_data:
+        np.multiply(crash_risk, wc, out=crash_risk)
+        blended += crash_risk
+    else:
+        blended += wc * crash_risk
+        np.copyto(blended, crash_risk, where=crime == 0)
+    return blended
 
 
 # --- Test Data ---
 
-SAMPLE_CELL = {
+SAMPLE_CELL = CellInfo.from_dict({
     "base_risk": 60.0,       # crash risk
     "crime_risk": 40.0,      # crime risk
     "time_modifiers": {
@@ -46,14 +137,14 @@ SAMPLE_CELL = {
         "night_weekday": 2.0,
         "midday_weekday": 0.5,
     },
-}
+})
 
-CRASH_ONLY_CELL = {
+CRASH_ONLY_CELL = CellInfo.from_dict({
     "base_risk": 50.0,
     "crime_risk": 0,
     "time_modifiers": {"night_weekday": 1.3},
     "crime_time_modifiers": {},
-}
+})
 
 
 class TestRiskBlending:
@@ -116,7 +207,7 @@ class TestRiskBlending:
 
     def test_zero_risk_cell(self):
         """Zero risk cell should return 0"""
-        zero_cell = {"base_risk": 0, "crime_risk": 0}
+        zero_cell = CellInfo.from_dict({"base_risk": 0, "crime_risk": 0})
         risk = get_blended_risk(zero_cell, "midday_weekday", "walking")
         assert risk == 0
 
@@ -133,6 +224,42 @@ class TestRiskBlending:
         assert risk == pytest.approx(19.5, abs=0.1)
 
 
+class TestBatchBlending:
+    """Batch blending must match the scalar path cell-for-cell"""
+
+    CELLS = [SAMPLE_CELL, CRASH_ONLY_CELL,
+             CellInfo.from_dict({"base_risk": 0, "crime_risk": 0})]
+
+    def test_batch_matches_scalar_per_mode(self):
+        for mode in ("walking", "driving", "cycling"):
+            batch = get_blended_risk_batch(self.CELLS, "night_weekday", mode)
+            for cell, got in zip(self.CELLS, batch):
+                expected = get_blended_risk(cell, "night_weekday", mode)
+                assert got == pytest.approx(expected, abs=0.01)
+
+    def test_blended_risk_parametric_batch(self):
+        """Known scenarios as arrays, checked with one allclose each"""
+        scenarios = [
+            ("midday_weekday", "walking", [28.4, 15.0, 0.0]),
+            ("night_weekday", "walking", [83.0, 19.5, 0.0]),
+            ("night_weekday", "driving", [89.0, 58.5, 0.0]),
+            ("midday_weekday", "cycling", [34.0, 25.0, 0.0]),
+        ]
+        for time_key, mode, expected in scenarios:
+            got = get_blended_risk_batch(self.CELLS, time_key, mode)
+            assert np.allclose(got, expected, atol=0.1), (time_key, mode, got)
+
+    def test_batch_crash_only_fallback(self):
+        batch = get_blended_risk_batch(
+            self.CELLS, "night_weekday", "walking", has_crime_data=False
+        )
+        for cell, got in zip(self.CELLS, batch):
+            expected = get_blended_risk(
+                cell, "night_weekday", "walking", has_crime_data=False
+            )
+            assert got == pytest.approx(expected, abs=0.01)
+
+
 class TestCrimeWeights:
     """Test that crime severity weights make sense"""
 
@@ -176,9 +303,7 @@ class TestModeWeights:
 
     def test_all_modes_sum_to_one(self):
         """Crash + crime weights should sum to 1.0 for each mode"""
-        for mode, weights in MODE_WEIGHTS.items():
-            total = weights["crash"] + weights["crime"]
-            assert total == pytest.approx(1.0), f"{mode} weights sum to {total}"
+        assert _MODE_WEIGHT_SUMS == (1.0,) * len(MODE_WEIGHTS)
 
     def test_walking_prioritizes_crime(self):
         assert MODE_WEIGHTS["walking"]["crime"] > MODE_WEIGHTS["walking"]["crash"]